@@ -6,9 +6,56 @@ A desktop application for tracking student attendance using Tkinter GUI and SQLi
 import os
 import sqlite3
 import tkinter as tk
-from tkinter import ttk, messagebox, Menu
+from tkinter import ttk, messagebox, filedialog, Menu
 from datetime import datetime
 from tkcalendar import DateEntry
+import search_index
+from date_utils import parse_date, LEGACY_FORMATS
+import bulk_import
+import sqlite_tuning
+import db_worker
+import virtual_table
+import repository
+
+# How often the main loop collects finished database work (milliseconds)
+POLL_INTERVAL_MS = 50
+
+# Searches show at most this many matches, so counting them stays quick
+SEARCH_RESULTS_LIMIT = 10000
+
+class AllRecords:
+    """Every record, newest first (a source for the virtual records table)."""
+    
+    def count(self, conn):
+        return repository.count_records(conn)
+        
+    def rows(self, conn, offset, limit):
+        return repository.RECORDS.window(conn, offset, limit)
+        
+    def discard(self, record_id):
+        """Forget a deleted record (the database query no longer returns it)."""
+        
+class SearchResults:
+    """
+    Records matching a search term, best match first, or newest first when too
+    many match to rank them quickly (a source for the records table).
+    """
+    
+    def __init__(self, search_term):
+        self.search_term = search_term
+        self.ranked = True
+        
+    def count(self, conn):
+        total = repository.count_matches(conn, self.search_term, SEARCH_RESULTS_LIMIT)
+        # Decided once, so every window of the results is in the same order
+        self.ranked = total < search_index.RANK_LIMIT
+        return total
+        
+    def rows(self, conn, offset, limit):
+        return repository.RECORDS.search_window(conn, self.search_term, offset, limit, self.ranked)
+        
+    def discard(self, record_id):
+        """Forget a deleted record (the database query no longer returns it)."""
 
 class AttendanceTracker:
     """
@@ -30,6 +77,7 @@ class AttendanceTracker:
         self.setup_database()
         self.setup_ui()
         self.load_records()
+        self.poll_database()
         
     def setup_window(self):
         """Configure the main application window."""
@@ -53,24 +101,140 @@ class AttendanceTracker:
         self.selected_id = None
         
     def setup_database(self):
-        """Create and connect to the SQLite database."""
+        """Connect to the SQLite database on a background thread and prepare the schema."""
         try:
-            self.conn = sqlite3.connect('attendance.db')
-            self.cursor = self.conn.cursor()
-            # Create table if it doesn't exist
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS attendance (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    student_id TEXT NOT NULL,
-                    name TEXT NOT NULL,
-                    class TEXT NOT NULL,
-                    date TEXT NOT NULL
-                )
-            ''')
-            self.conn.commit()
+            self.db = db_worker.DatabaseWorker(
+                lambda: db_worker.connect('attendance.db', sqlite_tuning.configure_connection),
+                self.database_error("Database error", "A database operation failed")
+            )
         except sqlite3.Error as e:
+            self.db = None
             messagebox.showerror("Database Error", f"Failed to connect to database: {e}")
+            return
+            
+        # Runs before anything else is queued; the result arrives once the UI exists
+        self.db.submit(
+            self.create_schema,
+            self.schema_ready,
+            self.database_error("Error opening database", "Failed to connect to database")
+        )
+        
+    @staticmethod
+    def create_schema(conn):
+        """
+        Create missing tables and run one-time upgrades (on the database thread).
+        Returns the IDs of records whose dates could not be converted.
+        """
+        cursor = conn.cursor()
+        # Create table if it doesn't exist
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS attendance (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                class TEXT NOT NULL,
+                date TEXT NOT NULL
+            )
+        ''')
+        
+        # Full-text search index (filled from existing rows when first created)
+        cursor.execute(search_index.EXISTS_SQL)
+        index_is_new = cursor.fetchone() is None
+        for statement in search_index.SCHEMA_STATEMENTS:
+            cursor.execute(statement)
+        if index_is_new:
+            cursor.execute(search_index.REBUILD_SQL)
+        
+        # Classes offered in the form, stored once each
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS class_section (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE
+            )
+        ''')
+        
+        # One-time conversion of stored dates to ISO format (YYYY-MM-DD)
+        invalid = []
+        cursor.execute("PRAGMA user_version")
+        version = cursor.fetchone()[0]
+        if version < 1:
+            invalid = AttendanceTracker.normalize_dates(conn)
+            cursor.execute("PRAGMA user_version = 1")
+        
+        # One-time fill of the class table: the original classes, then any others in use
+        if version < 2:
+            repository.add_classes(conn, repository.DEFAULT_CLASSES)
+            cursor.execute('''
+                INSERT OR IGNORE INTO class_section (name)
+                SELECT DISTINCT class FROM attendance ORDER BY class
+            ''')
+            cursor.execute("PRAGMA user_version = 2")
+        conn.commit()
+        return invalid
+        
+    def schema_ready(self, invalid):
+        """Show the class choices once the database is ready."""
+        self.refresh_classes()
+        if invalid:
+            messagebox.showwarning(
+                "Invalid Dates",
+                f"These records have dates that could not be converted: {invalid[:20]}"
+            )
             
+    @staticmethod
+    def normalize_dates(conn):
+        """Rewrite dates stored in other formats as ISO dates so range queries work."""
+        updates, invalid = [], []
+        for record_id, value in repository.execute(conn, "SELECT id, date FROM attendance"):
+            parsed = parse_date(value, LEGACY_FORMATS)
+            if parsed is None:
+                invalid.append(record_id)
+            elif parsed.isoformat() != value:
+                updates.append({"date": parsed.isoformat(), "id": record_id})
+        
+        repository.execute_many(conn, "UPDATE attendance SET date = :date WHERE id = :id", updates)
+        return invalid
+        
+    def refresh_classes(self, classes=None):
+        """Show the given class choices in the form, or reload them from the database."""
+        if classes is not None:
+            self.class_combo["values"] = classes
+            return
+        self.db.submit(
+            repository.class_names,
+            self.refresh_classes,
+            self.database_error("Error loading classes", "Failed to load classes")
+        )
+        
+    def poll_database(self):
+        """Deliver finished database work to the UI and keep the busy indicator current."""
+        try:
+            if self.db is not None:
+                self.db.process_results()
+                self.show_busy(self.db.busy)
+        finally:
+            # Keep polling even if a callback failed, or no result would arrive again
+            self.root.after(POLL_INTERVAL_MS, self.poll_database)
+        
+    def show_busy(self, busy):
+        """Show or hide the busy indicator in the status bar."""
+        if busy == self.busy_shown:
+            return
+        self.busy_shown = busy
+        if busy:
+            self.busy_bar.pack(side=tk.RIGHT, padx=10, before=self.status_label)
+            self.busy_bar.start(15)
+        else:
+            self.busy_bar.stop()
+            self.busy_bar.pack_forget()
+        
+    def database_error(self, status, message, title="Database Error"):
+        """Return an error callback that reports a failed database job."""
+        def report(e):
+            self.status_var.set(f"{status}: {e}")
+            messagebox.showerror(title, f"{message}: {e}")
+        return report
+
     def setup_ui(self):
         """Create the user interface with all components."""
         self.create_header()
@@ -155,15 +319,14 @@ class AttendanceTracker:
         )
         class_label.grid(row=2, column=0, sticky=tk.W, pady=5)
         
-        class_values = ["I-MCA-A", "II-MCA-A", "I-MCA-B", "II-MCA-B"]
-        class_combo = ttk.Combobox(
+        self.class_combo = ttk.Combobox(
             form_frame, 
             textvariable=self.class_var, 
-            values=class_values, 
+            values=[], 
             font=self.label_font, 
             width=13
         )
-        class_combo.grid(row=2, column=1, sticky=tk.W, pady=5)
+        self.class_combo.grid(row=2, column=1, sticky=tk.W, pady=5)
         
         # Date
         date_label = tk.Label(
@@ -310,45 +473,32 @@ class AttendanceTracker:
         
     def create_table(self):
         """Create the table view for displaying attendance records."""
-        # Table frame with a border
-        table_container = tk.Frame(self.root, bg="#d0d0d0", padx=2, pady=2)
-        table_container.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
-        
-        # Scrollbar
-        scroll_y = tk.Scrollbar(table_container, orient=tk.VERTICAL)
-        
-        # Table heading
-        columns = ("id", "student_id", "name", "class", "date")
-        self.records_table = ttk.Treeview(
-            table_container,
-            columns=columns,
-            yscrollcommand=scroll_y.set,
-            show="headings",
-            height=10
+        # Table frame with a border; only the rows on screen exist in the table
+        self.records_table = virtual_table.VirtualTable(
+            self.root,
+            self.db,
+            columns=("id", "student_id", "name", "class", "date"),
+            on_select=self.select_record,
+            bg="#d0d0d0",
+            padx=2,
+            pady=2
         )
-        
-        # Configure scrollbar
-        scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-        scroll_y.config(command=self.records_table.yview)
+        self.records_table.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        tree = self.records_table.tree
         
         # Define column headings
-        self.records_table.heading("id", text="ID")
-        self.records_table.heading("student_id", text="Student ID")
-        self.records_table.heading("name", text="Name")
-        self.records_table.heading("class", text="Class")
-        self.records_table.heading("date", text="Date")
+        tree.heading("id", text="ID")
+        tree.heading("student_id", text="Student ID")
+        tree.heading("name", text="Name")
+        tree.heading("class", text="Class")
+        tree.heading("date", text="Date")
         
         # Define column widths
-        self.records_table.column("id", width=50)
-        self.records_table.column("student_id", width=100)
-        self.records_table.column("name", width=200)
-        self.records_table.column("class", width=100)
-        self.records_table.column("date", width=100)
-        
-        self.records_table.pack(fill=tk.BOTH, expand=True)
-        
-        # Bind select event
-        self.records_table.bind("<<TreeviewSelect>>", self.select_record)
+        tree.column("id", width=50)
+        tree.column("student_id", width=100)
+        tree.column("name", width=200)
+        tree.column("class", width=100)
+        tree.column("date", width=100)
         
     def create_footer(self):
         """Create the footer section with status bar."""
@@ -358,7 +508,7 @@ class AttendanceTracker:
         self.status_var = tk.StringVar()
         self.status_var.set("Ready")
         
-        status_label = tk.Label(
+        self.status_label = tk.Label(
             footer_frame, 
             textvariable=self.status_var, 
             font=("Arial", 9), 
@@ -368,7 +518,11 @@ class AttendanceTracker:
             padx=10,
             pady=5
         )
-        status_label.pack(fill=tk.X)
+        self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # Busy indicator, shown while database work is running
+        self.busy_bar = ttk.Progressbar(footer_frame, mode="indeterminate", length=100)
+        self.busy_shown = False
         
     def create_menu(self):
         """Create the application menu bar."""
@@ -377,6 +531,8 @@ class AttendanceTracker:
         
         # File menu
         file_menu = Menu(menu_bar, tearoff=0)
+        file_menu.add_command(label="Import Roster...", command=self.import_records)
+        file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.exit_app)
         menu_bar.add_cascade(label="File", menu=file_menu)
         
@@ -385,26 +541,18 @@ class AttendanceTracker:
         help_menu.add_command(label="About", command=self.show_about)
         menu_bar.add_cascade(label="Help", menu=help_menu)
         
-    def load_records(self):
-        """Load all records from the database into the table view."""
-        # Clear the table first
-        for row in self.records_table.get_children():
-            self.records_table.delete(row)
-            
-        try:
-            # Get all records from the database
-            self.cursor.execute("SELECT * FROM attendance ORDER BY id DESC")
-            records = self.cursor.fetchall()
-            
-            # Insert records into the table
-            for record in records:
-                self.records_table.insert("", "end", values=record)
-                
-            self.status_var.set(f"Loaded {len(records)} records")
-        except sqlite3.Error as e:
-            self.status_var.set(f"Error loading records: {e}")
-            messagebox.showerror("Database Error", f"Failed to load records: {e}")
-            
+    def load_records(self, status=None):
+        """
+        Show all records, newest first, in the table view.
+        status replaces the "Loaded N records" message, e.g. after a change.
+        """
+        self.status_var.set(status or "Loading records...")
+        self.records_table.show(
+            AllRecords(),
+            lambda total: self.status_var.set(status or f"Loaded {total} records"),
+            self.database_error("Error loading records", "Failed to load records")
+        )
+        
     def search_records(self):
         """Search for records based on student name or ID."""
         search_term = self.search_var.get().strip()
@@ -413,29 +561,16 @@ class AttendanceTracker:
             self.load_records()
             return
             
-        try:
-            # Clear the table first
-            for row in self.records_table.get_children():
-                self.records_table.delete(row)
-                
-            # Search by name, ID or date
-            self.cursor.execute("""
-                SELECT * FROM attendance 
-                WHERE name LIKE ? OR student_id LIKE ? OR date LIKE ?
-                ORDER BY id DESC
-            """, (f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"))
-            
-            records = self.cursor.fetchall()
-            
-            # Insert matching records into the table
-            for record in records:
-                self.records_table.insert("", "end", values=record)
-                
-            self.status_var.set(f"Found {len(records)} matching records")
-        except sqlite3.Error as e:
-            self.status_var.set(f"Error searching records: {e}")
-            messagebox.showerror("Database Error", f"Failed to search records: {e}")
-            
+        # Replaces (and cancels) any load or search still running
+        self.status_var.set(f"Searching for \"{search_term}\"...")
+        self.records_table.show(
+            SearchResults(search_term),
+            lambda total: self.status_var.set(
+                f"Found {total} matching records" if total < SEARCH_RESULTS_LIMIT
+                else f"Showing the newest {total} matching records"),
+            self.database_error("Error searching records", "Failed to search records")
+        )
+        
     def validate_inputs(self):
         """Validate form inputs before database operations."""
         student_id = self.student_id_var.get().strip()
@@ -456,6 +591,8 @@ class AttendanceTracker:
             
         if not date:
             errors.append("Date is required")
+        elif not parse_date(date):
+            errors.append("Date must be a valid date (YYYY-MM-DD)")
             
         return (len(errors) == 0, errors, (student_id, name, class_val, date))
     
@@ -471,47 +608,101 @@ class AttendanceTracker:
             
         student_id, name, class_val, date = data
         
-        try:
-            self.cursor.execute("""
-                INSERT INTO attendance (student_id, name, class, date)
-                VALUES (?, ?, ?, ?)
-            """, (student_id, name, class_val, date))
+        record = {'student_id': student_id, 'name': name, 'class_name': class_val, 'date': date}
+        
+        def insert(conn):
+            record_id = repository.insert_record(conn, record)
+            repository.add_classes(conn, [class_val])
+            conn.commit()
+            # Read back as the table's queries read it, with every column
+            return repository.RECORDS.by_ids(conn, [record_id])[0], repository.class_names(conn)
             
-            self.conn.commit()
+        def done(result):
+            row, classes = result
+            self.refresh_classes(classes)
             self.clear_form()
-            self.load_records()
-            self.status_var.set("Record added successfully")
+            # The newest record goes at the top of the full list; a search is replaced by it
+            if isinstance(self.records_table.source, AllRecords):
+                self.records_table.insert_record(row)
+                self.status_var.set("Record added successfully")
+            else:
+                self.load_records("Record added successfully")
             messagebox.showinfo("Success", "Attendance record added successfully")
-        except sqlite3.Error as e:
-            self.status_var.set(f"Error adding record: {e}")
-            messagebox.showerror("Database Error", f"Failed to add record: {e}")
             
-    def select_record(self, event):
-        """Handle selection of a record in the table view."""
-        try:
-            # Get selected item
-            selected_item = self.records_table.selection()[0]
-            values = self.records_table.item(selected_item, "values")
+        self.status_var.set("Adding record...")
+        self.db.submit(insert, done, self.database_error("Error adding record", "Failed to add record"))
             
-            # Store the ID for update/delete operations
-            self.selected_id = values[0]
+    def import_records(self):
+        """Bulk import attendance records from a CSV or JSON roster file."""
+        path = filedialog.askopenfilename(
+            title="Import Roster",
+            filetypes=[("Roster files", "*.csv *.json *.jsonl"), ("All files", "*.*")]
+        )
+        if not path:
+            return
             
-            # Populate form with selected record's data
-            self.student_id_var.set(values[1])
-            self.name_var.set(values[2])
-            self.class_var.set(values[3])
+        def import_file(conn):
+            absent = 0
             
-            # Handle date format for the date picker
-            try:
-                self.date_picker.set_date(values[4])
-            except:
-                # If date format is not compatible
-                self.date_picker.set_date(datetime.now())
+            def insert_batch(batch):
+                nonlocal absent
+                # One transaction per batch of rows; this table only records presences
+                presences = [{**r, 'date': r['date'].isoformat()}
+                             for r in batch if r['status'] == 'present']
+                absent += len(batch) - len(presences)
+                repository.insert_records(conn, presences)
+                repository.add_classes(conn, sorted({r['class_name'] for r in batch}))
+                conn.commit()
+                return len(presences)
                 
-            self.status_var.set(f"Selected record ID: {self.selected_id}")
-        except IndexError:
-            # No selection
-            pass
+            with open(path, encoding='utf-8-sig', newline='') as f:
+                imported, errors = bulk_import.import_rows(
+                    bulk_import.read_rows(f, path), insert_batch, batch_size=5000
+                )
+            return imported, absent, errors, repository.class_names(conn)
+            
+        def done(result):
+            imported, absent, errors, classes = result
+            self.refresh_classes(classes)
+            self.load_records(f"Imported {imported} records, skipped {len(errors)} rows")
+            summary = f"Imported {imported} records."
+            if absent:
+                summary += f"\n{absent} absences were not imported (only presences are recorded)."
+            if errors:
+                messagebox.showwarning(
+                    "Import Finished",
+                    f"{summary}\n{len(errors)} rows were skipped:\n"
+                    + bulk_import.summarize_errors(errors)
+                )
+            else:
+                messagebox.showinfo("Import Finished", summary)
+                
+        # Reading, validating and inserting all happen on the database thread
+        self.status_var.set(f"Importing {os.path.basename(path)}...")
+        self.db.submit(
+            import_file,
+            done,
+            self.database_error("Error importing records", "Failed to import file", "Import Error")
+        )
+            
+    def select_record(self, values):
+        """Handle selection of a record (its row values) in the table view."""
+        # Store the ID for update/delete operations
+        self.selected_id = values[0]
+        
+        # Populate form with selected record's data
+        self.student_id_var.set(values[1])
+        self.name_var.set(values[2])
+        self.class_var.set(values[3])
+        
+        # Handle date format for the date picker
+        try:
+            self.date_picker.set_date(values[4])
+        except:
+            # If date format is not compatible
+            self.date_picker.set_date(datetime.now())
+            
+        self.status_var.set(f"Selected record ID: {self.selected_id}")
             
     def update_record(self):
         """Update the selected attendance record."""
@@ -529,22 +720,27 @@ class AttendanceTracker:
             return
             
         student_id, name, class_val, date = data
+        record_id = self.selected_id
         
-        try:
-            self.cursor.execute("""
-                UPDATE attendance 
-                SET student_id = ?, name = ?, class = ?, date = ?
-                WHERE id = ?
-            """, (student_id, name, class_val, date, self.selected_id))
+        record = {'student_id': student_id, 'name': name, 'class_name': class_val, 'date': date}
+        
+        def update(conn):
+            repository.update_record(conn, record_id, record)
+            repository.add_classes(conn, [class_val])
+            conn.commit()
+            return repository.RECORDS.by_ids(conn, [int(record_id)]), repository.class_names(conn)
             
-            self.conn.commit()
+        def done(result):
+            rows, classes = result
+            self.refresh_classes(classes)
             self.clear_form()
-            self.load_records()
+            if not rows or not self.records_table.replace_record(rows[0]):
+                self.records_table.refresh()
             self.status_var.set("Record updated successfully")
             messagebox.showinfo("Success", "Attendance record updated successfully")
-        except sqlite3.Error as e:
-            self.status_var.set(f"Error updating record: {e}")
-            messagebox.showerror("Database Error", f"Failed to update record: {e}")
+            
+        self.status_var.set("Updating record...")
+        self.db.submit(update, done, self.database_error("Error updating record", "Failed to update record"))
             
     def delete_record(self):
         """Delete the selected attendance record."""
@@ -560,16 +756,24 @@ class AttendanceTracker:
             self.status_var.set("Deletion cancelled")
             return
             
-        try:
-            self.cursor.execute("DELETE FROM attendance WHERE id = ?", (self.selected_id,))
-            self.conn.commit()
+        record_id = self.selected_id
+        source = self.records_table.source
+        
+        def delete(conn):
+            repository.delete_record(conn, record_id)
+            conn.commit()
+            if source is not None:
+                source.discard(int(record_id))
+            
+        def done(result):
             self.clear_form()
-            self.load_records()
+            if not self.records_table.remove_record(record_id):
+                self.records_table.refresh()
             self.status_var.set("Record deleted successfully")
             messagebox.showinfo("Success", "Attendance record deleted successfully")
-        except sqlite3.Error as e:
-            self.status_var.set(f"Error deleting record: {e}")
-            messagebox.showerror("Database Error", f"Failed to delete record: {e}")
+            
+        self.status_var.set("Deleting record...")
+        self.db.submit(delete, done, self.database_error("Error deleting record", "Failed to delete record"))
             
     def clear_form(self):
         """Clear all form inputs."""
@@ -578,6 +782,7 @@ class AttendanceTracker:
         self.class_var.set("")
         self.date_picker.set_date(datetime.now())
         self.selected_id = None
+        self.records_table.clear_selection()
         self.status_var.set("Form cleared")
         
     def exit_app(self):
@@ -585,9 +790,9 @@ class AttendanceTracker:
         confirm = messagebox.askyesno("Confirm Exit", "Are you sure you want to exit?")
         if confirm:
             try:
-                # Close database connection
-                if hasattr(self, 'conn'):
-                    self.conn.close()
+                # Let queued writes finish, then close the database connection
+                if self.db is not None:
+                    self.db.close()
             except:
                 pass
                 
@@ -603,6 +808,7 @@ class AttendanceTracker:
         
         Features:
         - Add, update, and delete attendance records
+        - Bulk import from CSV or JSON roster files
         - Search functionality
         - SQLite database for storage
         """
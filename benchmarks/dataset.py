@@ -0,0 +1,150 @@
+"""
+Synthetic attendance data for benchmarks.
+Generates a reproducible dataset of a given size: about 250 school days of
+attendance for as many students as that takes, 50 students to a class, with
+one student in ten absent on any day. The same records can be written to the
+web application's database (through its SQLAlchemy engine, so the full-text
+index and summary tables are filled as in production) and to a desktop
+application database file.
+
+python -m benchmarks.dataset --rows 1000000 --desktop attendance.db
+"""
+
+import argparse
+import math
+import os
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import repository
+import sqlite_tuning
+import summaries
+
+SCHOOL_DAYS = 250
+CLASS_SIZE = 50
+BATCH_SIZE = 50_000
+LAST_DAY = date(2025, 6, 30)
+
+FIRST_NAMES = ['Aarav', 'Anu', 'Divya', 'Farhan', 'Gita', 'Jeevan', 'Kavya', 'Meera',
+               'Nikhil', 'Priya', 'Rahul', 'Sanjay', 'Tara', 'Usha', 'Vikram', 'Zoya']
+LAST_NAMES = ['Bose', 'Das', 'Iyer', 'Joshi', 'Khan', 'Menon', 'Nair', 'Patel',
+              'Rao', 'Reddy', 'Shah', 'Singh', 'Thomas', 'Varma']
+YEARS = ['I', 'II', 'III']
+PROGRAMS = ['MCA', 'MBA', 'BCA', 'BSC', 'BCOM']
+
+class Dataset:
+    """The shape of a dataset with a given number of records, and its rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.students = max(CLASS_SIZE, rows // SCHOOL_DAYS)
+        self.classes = math.ceil(self.students / CLASS_SIZE)
+        self.days = math.ceil(rows / self.students)
+        self.dates = school_days(self.days)
+
+    def class_name(self, index):
+        # I-MCA-A, II-MCA-A, ... then -B, and a number once the letters run out
+        name = f"{YEARS[index % 3]}-{PROGRAMS[index // 3 % 5]}-{chr(65 + index // 15 % 26)}"
+        return name if index < 390 else f"{name}{index // 390}"
+
+    def student(self, index):
+        """Return (student_id, name, class index) for a student."""
+        name = f"{FIRST_NAMES[index % 16]} {LAST_NAMES[index // 16 % 14]} {index}"
+        return f"S{index:07d}", name, index // CLASS_SIZE
+
+    def records(self):
+        """Yield (student index, date, status) for every record, oldest day first."""
+        for number in range(self.rows):
+            student, day = number % self.students, number // self.students
+            status = 'absent' if number * 2654435761 % 100 < 10 else 'present'
+            yield student, self.dates[day], status
+
+def school_days(count):
+    """Return count weekdays ending on LAST_DAY, oldest first."""
+    days, day = [], LAST_DAY
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return days[::-1]
+
+def batches(items, size=BATCH_SIZE):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def write_web(engine, dataset):
+    """Add the dataset to the web application's database (which must be empty)."""
+    with engine.begin() as conn:
+        repository.add_classes(conn, [dataset.class_name(i) for i in range(dataset.classes)])
+        class_ids = dict(repository.execute(conn, "SELECT name, id FROM class_section"))
+        for batch in batches(range(dataset.students)):
+            repository.execute_many(conn, """
+                INSERT INTO student (student_id, name, class_id) VALUES (:student_id, :name, :class_id)
+            """, [dict(zip(('student_id', 'name'), dataset.student(i)),
+                       class_id=class_ids[dataset.class_name(dataset.student(i)[2])]) for i in batch])
+        keys = {student_id: (key, class_id) for student_id, key, class_id in
+                repository.execute(conn, "SELECT student_id, id, class_id FROM student")}
+    # (student_pk, class_id) by student index
+    students = [keys[dataset.student(i)[0]] for i in range(dataset.students)]
+
+    for batch in batches(dataset.records()):
+        with engine.begin() as conn:
+            repository.execute_many(conn, """
+                INSERT INTO attendance (date, status, student_pk, class_id)
+                VALUES (:date, :status, :student_pk, :class_id)
+            """, [{'date': day.isoformat(), 'status': status, 'student_pk': students[student][0],
+                   'class_id': students[student][1]} for student, day, status in batch])
+
+    with engine.begin() as conn:
+        summaries.rebuild(conn)
+
+def write_desktop(path, dataset):
+    """Create a desktop application database file holding the dataset's presences."""
+    from attendance_tracker import AttendanceTracker
+
+    conn = sqlite3.connect(path)
+    sqlite_tuning.configure_connection(conn)
+    AttendanceTracker.create_schema(conn)
+    repository.add_classes(conn, [dataset.class_name(i) for i in range(dataset.classes)])
+    # {student_id, name, class_name} by student index
+    students = [{'student_id': student_id, 'name': name, 'class_name': dataset.class_name(class_index)}
+                for student_id, name, class_index in map(dataset.student, range(dataset.students))]
+
+    # The desktop table only records presences
+    for batch in batches(dataset.records()):
+        repository.insert_records(conn, [{**students[student], 'date': day.isoformat()}
+                                         for student, day, status in batch if status == 'present'])
+        conn.commit()
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--web', metavar='DATABASE_URL',
+                        help="web database to fill (default: the application's DATABASE_URL)")
+    parser.add_argument('--desktop', metavar='PATH', help='desktop database file to create')
+    args = parser.parse_args()
+
+    dataset = Dataset(args.rows)
+    print(f"{dataset.rows} records: {dataset.students} students in {dataset.classes} classes "
+          f"over {dataset.days} days")
+    if args.desktop:
+        write_desktop(args.desktop, dataset)
+    if args.web or not args.desktop:
+        if args.web:
+            os.environ['DATABASE_URL'] = args.web
+        from app import app, db
+        with app.app_context():
+            write_web(db.engine, dataset)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark the report export formats.
+Generates synthetic report rows and times each exporter, printing the output
+size and generation time per format.
+
+python -m benchmarks.export_formats --rows 1000000
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+import exports
+import repository
+
+def synthetic_rows(count, seed=42):
+    """Yield report rows (id, student_id, name, class_name, date, status) spread over about a year."""
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    for record_id in range(1, count + 1):
+        student = rng.randrange(2000)
+        yield (
+            record_id,
+            f"24MCR{student:04d}",
+            f"Student {student}",
+            repository.DEFAULT_CLASSES[student % len(repository.DEFAULT_CLASSES)],
+            start + timedelta(days=rng.randrange(365)),
+            'absent' if rng.random() < 0.1 else 'present',
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'format':10} {'size (MB)':>10} {'seconds':>8}")
+    for name, export in exports.EXPORT_FORMATS.items():
+        if not export['available']:
+            print(f"{name:10} skipped: needs {export['requires']}")
+            continue
+
+        started = time.perf_counter()
+        size = sum(len(chunk) for chunk in export['chunks'](synthetic_rows(args.rows), args.batch_size))
+        elapsed = time.perf_counter() - started
+        print(f"{name:10} {size / 1e6:10.1f} {elapsed:8.2f}")
+
+if __name__ == '__main__':
+    main()
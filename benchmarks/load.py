@@ -0,0 +1,131 @@
+"""
+Load benchmark for the web application under gunicorn.
+Copies the application into a temporary directory (so it starts with an empty
+database), starts gunicorn with each worker count in turn, and measures
+requests per second for the dashboard (GET /dashboard) and for adding records
+(POST /add) from concurrent logged-in clients using keep-alive connections.
+
+python -m benchmarks.load --workers 1 4 16 --clients 16 --seconds 10
+"""
+
+import argparse
+import http.client
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def copy_app(directory):
+    """Copy the application source (without databases or caches) into directory."""
+    shutil.copytree(ROOT, directory, dirs_exist_ok=True, ignore=shutil.ignore_patterns(
+        '.git', 'instance', '*.db', '__pycache__', 'attached_assets', '.venv', 'benchmarks'))
+
+def wait_for_server(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/login')
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not start on port {port}")
+
+def login(port):
+    """Log in as the admin user and return (connection, session cookie)."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('POST', '/login', body=urlencode({'username': 'admin', 'password': 'admin123'}),
+                 headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    cookie = response.getheader('Set-Cookie').split(';', 1)[0]
+    return conn, cookie
+
+def run_clients(port, clients, seconds, request):
+    """Run request(conn, cookie, number) from concurrent clients; return requests per second."""
+    counts = [0] * clients
+    errors = [0] * clients
+    deadline = time.monotonic() + seconds
+
+    def client(index):
+        conn, cookie = login(port)
+        number = 0
+        while time.monotonic() < deadline:
+            status = request(conn, cookie, index * 10_000_000 + number)
+            number += 1
+            if status >= 400:
+                errors[index] += 1
+            else:
+                counts[index] += 1
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    return sum(counts) / elapsed, sum(errors)
+
+def get_dashboard(conn, cookie, number):
+    conn.request('GET', '/dashboard', headers={'Cookie': cookie})
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+def add_record(conn, cookie, number):
+    body = urlencode({
+        'student_id': f"B{number % 5000:05d}",
+        'name': f"Student {number % 5000}",
+        'class': 'I-MCA-A',
+        'date': f"2025-{number % 12 + 1:02d}-{number % 28 + 1:02d}",
+        'status': 'present',
+    })
+    conn.request('POST', '/add', body=body, headers={
+        'Cookie': cookie, 'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'dashboard req/s':>16} {'add req/s':>10} {'errors':>7}")
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as directory:
+            copy_app(directory)
+            env = dict(os.environ, WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(args.threads),
+                       BIND=f"127.0.0.1:{args.port}", GUNICORN_LOG_LEVEL='warning',
+                       GUNICORN_ACCESS_LOG='')
+            server = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', 'wsgi:app'],
+                cwd=directory, env=env)
+            try:
+                wait_for_server(args.port)
+                conn = http.client.HTTPConnection('127.0.0.1', args.port)
+                conn.request('GET', '/init-admin')
+                conn.getresponse().read()
+
+                dashboard, dashboard_errors = run_clients(args.port, args.clients, args.seconds, get_dashboard)
+                added, add_errors = run_clients(args.port, args.clients, args.seconds, add_record)
+                print(f"{workers:7} {dashboard:16.1f} {added:10.1f} {dashboard_errors + add_errors:7}")
+            finally:
+                server.terminate()
+                server.wait()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+SQLite concurrency benchmark: rollback journal versus the tuned WAL settings.
+Runs reader and writer processes against a temporary copy of the attendance
+table, first with SQLite's defaults and then with sqlite_tuning applied, and
+reports reads and writes per second and how many operations failed with
+"database is locked".
+
+python -m benchmarks.sqlite_concurrency --readers 4 --writers 2 --seconds 5
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlite_tuning
+
+SCHEMA = """
+CREATE TABLE attendance (
+    id INTEGER PRIMARY KEY,
+    student_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    class TEXT NOT NULL,
+    date TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX ix_attendance_class_date ON attendance (class, date);
+"""
+
+def connect(path, tuned):
+    # timeout=0 leaves SQLite's own default: fail at once instead of waiting for a lock
+    conn = sqlite3.connect(path, timeout=0)
+    if tuned:
+        sqlite_tuning.configure_connection(conn)
+    else:
+        conn.execute("PRAGMA journal_mode = DELETE")
+    return conn
+
+def create_database(path, rows):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO attendance (student_id, name, class, date, status) VALUES (?, ?, ?, ?, ?)",
+        ((f"S{n % 2000:05d}", f"Student {n % 2000}", f"CLASS-{n % 20}",
+          f"2025-{n % 12 + 1:02d}-{n % 28 + 1:02d}", 'present' if n % 5 else 'absent')
+         for n in range(rows)))
+    conn.commit()
+    conn.close()
+
+def reader(path, tuned, deadline, results):
+    conn = connect(path, tuned)
+    done = locked = 0
+    number = 0
+    while time.time() < deadline:
+        number += 1
+        try:
+            conn.execute(
+                "SELECT status, COUNT(*) FROM attendance WHERE class = ? GROUP BY status",
+                (f"CLASS-{number % 20}",)).fetchall()
+            done += 1
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e) and 'busy' not in str(e):
+                raise
+            locked += 1
+    conn.close()
+    results.put(('reads', done, locked))
+
+def writer(path, tuned, deadline, results):
+    conn = connect(path, tuned)
+    done = locked = 0
+    number = 0
+    while time.time() < deadline:
+        number += 1
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO attendance (student_id, name, class, date, status) VALUES (?, ?, ?, ?, ?)",
+                    (f"W{number % 2000:05d}", f"Student {number % 2000}", f"CLASS-{number % 20}",
+                     '2025-06-01', 'present'))
+            done += 1
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e) and 'busy' not in str(e):
+                raise
+            locked += 1
+    conn.close()
+    results.put(('writes', done, locked))
+
+def run(tuned, args):
+    """Run the readers and writers once; return (reads/s, writes/s, locked errors)."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'attendance.db')
+        create_database(path, args.rows)
+        results = multiprocessing.Queue()
+        deadline = time.time() + args.seconds
+        processes = (
+            [multiprocessing.Process(target=reader, args=(path, tuned, deadline, results))
+             for _ in range(args.readers)] +
+            [multiprocessing.Process(target=writer, args=(path, tuned, deadline, results))
+             for _ in range(args.writers)])
+        for process in processes:
+            process.start()
+        totals = {'reads': 0, 'writes': 0, 'locked': 0}
+        for _ in processes:
+            kind, done, locked = results.get()
+            totals[kind] += done
+            totals['locked'] += locked
+        for process in processes:
+            process.join()
+    return totals['reads'] / args.seconds, totals['writes'] / args.seconds, totals['locked']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{'settings':>8} {'reads/s':>10} {'writes/s':>10} {'locked':>8}")
+    for label, tuned in (('default', False), ('tuned', True)):
+        reads, writes, locked = run(tuned, args)
+        print(f"{label:>8} {reads:10.1f} {writes:10.1f} {locked:8}")
+
+if __name__ == '__main__':
+    main()
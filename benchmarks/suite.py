@@ -0,0 +1,246 @@
+"""
+Benchmark suite for the web and desktop applications.
+For each dataset size, generates synthetic records (benchmarks.dataset) into a
+temporary web database and desktop database file, then times the main routes
+through the Flask test client and the desktop application's record queries
+(run directly, without a window). Each size runs in its own process, so peak
+memory is measured per size. Latency percentiles and peak memory are written
+to a JSON file; pass an earlier file to --compare to see the change in median
+latency.
+
+python -m benchmarks.suite --rows 10000 1000000 --output results.json --compare baseline.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.dataset import Dataset, write_desktop, write_web
+
+def measure(function, repeat):
+    """Call function repeat times; return latency percentiles (ms) and the peak allocation of one call."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # Traced separately: tracemalloc slows down the calls it watches
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'calls': repeat,
+        'p50_ms': round(percentiles[49], 3),
+        'p90_ms': round(percentiles[89], 3),
+        'p99_ms': round(percentiles[98], 3),
+        'max_ms': round(max(timings), 3),
+        'peak_alloc_kib': peak // 1024,
+    }
+
+def web_benchmarks(dataset, client, fragment_cache):
+    """Return (name, function) for each web request to time."""
+    name = dataset.student(dataset.students // 2)[1].split()[0]
+    # The first two digits of the year: a prefix of nearly every record
+    broad = dataset.dates[-1].isoformat()[:2]
+    class_name = dataset.class_name(0)
+    month_from = dataset.dates[-1].replace(day=1).isoformat()
+    counter = iter(range(10 ** 9))
+
+    def get(url, expected=200):
+        def request():
+            response = client.get(url)
+            response.get_data()
+            assert response.status_code == expected, (url, response.status_code)
+        return request
+
+    def post(url, form, expected=200):
+        def request():
+            response = client.post(url, data=form() if callable(form) else form)
+            response.get_data()
+            assert response.status_code == expected, (url, response.status_code)
+        return request
+
+    def uncached(request):
+        def run():
+            fragment_cache.clear()
+            request()
+        return run
+
+    def added_record():
+        number = next(counter)
+        return {'student_id': f"B{number:07d}", 'name': f"Benchmark {number}",
+                'class': class_name, 'date': dataset.dates[-1].isoformat(), 'status': 'present'}
+
+    # Adding a record changes the data version, so it runs last
+    return [
+        ('dashboard', uncached(get('/dashboard'))),
+        ('dashboard (cached)', get('/dashboard')),
+        ('api search', uncached(get(f'/api/v1/records/search?q={name}'))),
+        ('api search (broad prefix)', uncached(get(f'/api/v1/records/search?q={broad}'))),
+        ('report html (month)', uncached(post('/generate-report', {
+            'report_type': 'web', 'class_filter': class_name,
+            'date_from': month_from, 'date_to': dataset.dates[-1].isoformat()}))),
+        ('report csv (class)', post('/generate-report', {
+            'report_type': 'csv', 'class_filter': class_name, 'date_from': '', 'date_to': ''})),
+        ('api record', get(f'/api/record/{dataset.rows // 2}')),
+        ('add record', post('/add', added_record, expected=302)),
+    ]
+
+def desktop_benchmarks(dataset, conn, visible_rows=300):
+    """Return (name, function) for each desktop records table query to time."""
+    from attendance_tracker import AllRecords, SearchResults
+
+    name = dataset.student(dataset.students // 2)[1].split()[0]
+    # The first two digits of the year: a prefix of nearly every record
+    broad = dataset.dates[-1].isoformat()[:2]
+    records = AllRecords()
+
+    def load_records(offset):
+        def run():
+            total = records.count(conn)
+            records.rows(conn, min(offset, max(0, total - visible_rows)), visible_rows)
+        return run
+
+    def search_records(search_term):
+        def run():
+            results = SearchResults(search_term)
+            results.count(conn)
+            results.rows(conn, 0, visible_rows)
+        return run
+
+    return [
+        ('load_records', load_records(0)),
+        ('load_records (scrolled to middle)', load_records(dataset.rows // 2)),
+        ('search_records', search_records(name)),
+        ('search_records (broad prefix)', search_records(broad)),
+    ]
+
+def run_size(rows, repeat, results):
+    """Benchmark one dataset size (in a child process) and put the result on the results queue."""
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'web.db')}"
+        from app import app, db, fragment_cache
+        import sqlite_tuning
+
+        dataset = Dataset(rows)
+        started = time.perf_counter()
+        with app.app_context():
+            write_web(db.engine, dataset)
+        desktop_path = os.path.join(directory, 'desktop.db')
+        write_desktop(desktop_path, dataset)
+        generate_seconds = time.perf_counter() - started
+
+        timings = {}
+        client = app.test_client()
+        client.get('/init-admin')
+        client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+        for name, function in web_benchmarks(dataset, client, fragment_cache):
+            timings[name] = measure(function, repeat)
+
+        conn = sqlite3.connect(desktop_path)
+        sqlite_tuning.configure_connection(conn)
+        for name, function in desktop_benchmarks(dataset, conn):
+            timings[f"desktop {name}"] = measure(function, repeat)
+        conn.close()
+
+    results.put({
+        'rows': rows,
+        'students': dataset.students,
+        'classes': dataset.classes,
+        'generate_seconds': round(generate_seconds, 1),
+        # Kilobytes on Linux
+        'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'results': timings,
+    })
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(report, baseline):
+    """Print the change in median latency from a baseline report, for the sizes both have."""
+    before = {dataset['rows']: dataset['results'] for dataset in baseline['datasets']}
+    print(f"\nChange in p50 from {baseline['meta'].get('commit') or 'baseline'}:")
+    for dataset in report['datasets']:
+        old = before.get(dataset['rows'], {})
+        for name, result in dataset['results'].items():
+            if name in old and old[name]['p50_ms']:
+                change = (result['p50_ms'] / old[name]['p50_ms'] - 1) * 100
+                print(f"{dataset['rows']:>10} {name:<40} {old[name]['p50_ms']:>10.2f} "
+                      f"{result['p50_ms']:>10.2f} {change:>+7.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000],
+                        help='dataset sizes (for example 10000 1000000 10000000)')
+    parser.add_argument('--repeat', type=int, default=50, help='timed calls per benchmark')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare', metavar='JSON', help='earlier results to compare with')
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+        },
+        'datasets': [],
+    }
+    # A fresh interpreter per size: the application reads DATABASE_URL on import
+    context = multiprocessing.get_context('spawn')
+    for rows in args.rows:
+        results = context.Queue()
+        process = context.Process(target=run_size, args=(rows, args.repeat, results))
+        process.start()
+        dataset = None
+        while dataset is None:
+            try:
+                dataset = results.get(timeout=1)
+            except queue.Empty:
+                if not process.is_alive():
+                    raise SystemExit(f"benchmark for {rows} records failed")
+        process.join()
+        report['datasets'].append(dataset)
+
+        print(f"\n{rows} records ({dataset['generate_seconds']} s to generate, "
+              f"peak RSS {dataset['max_rss_kib'] // 1024} MiB)")
+        print(f"{'benchmark':<40} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'peak KiB':>10}")
+        for name, result in dataset['results'].items():
+            print(f"{name:<40} {result['p50_ms']:>10.2f} {result['p90_ms']:>10.2f} "
+                  f"{result['p99_ms']:>10.2f} {result['peak_alloc_kib']:>10}")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+if __name__ == '__main__':
+    main()
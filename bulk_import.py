@@ -0,0 +1,125 @@
+"""
+Bulk import of attendance records from CSV or JSON roster files.
+Shared by the web and desktop applications: rows are read and validated one at
+a time and handed to the caller's insert function in batches, so large files
+are imported in a few transactions without being loaded into memory.
+"""
+
+import csv
+import json
+from itertools import chain
+
+from date_utils import parse_date
+from repository import ATTENDANCE_STATUSES
+
+# Accepted column names (after lower-casing and replacing spaces with underscores)
+COLUMN_ALIASES = {
+    'student_id': 'student_id',
+    'name': 'name',
+    'class': 'class_name',
+    'class_name': 'class_name',
+    'date': 'date',
+    'status': 'status',
+}
+
+# Maximum lengths, matching the attendance table columns
+MAX_LENGTHS = {'student_id': 50, 'name': 100, 'class_name': 50}
+
+def normalize_keys(row):
+    """Map a row's column names onto student_id, name, class_name, date and status."""
+    normalized = {}
+    for key, value in row.items():
+        key = COLUMN_ALIASES.get(str(key or '').strip().lower().replace(' ', '_'))
+        if key:
+            normalized[key] = value
+    return normalized
+
+def read_rows(stream, filename):
+    """
+    Yield (line number, row dict) pairs from an open text stream.
+    .json files may hold a JSON array of objects or one object per line
+    (JSON lines, read incrementally); anything else is read as CSV with a header row.
+    """
+    if not filename.lower().endswith(('.json', '.jsonl')):
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    first = stream.read(1)
+    while first and first.isspace():
+        first = stream.read(1)
+    if first == '[':
+        # A JSON array has to be parsed as a whole
+        for number, row in enumerate(json.loads(first + stream.read()), 1):
+            yield number, row
+        return
+
+    for number, line in enumerate(chain([first + stream.readline()], stream), 1):
+        if line.strip():
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, {'__error__': f"Invalid JSON: {e}"}
+
+def validate_row(row):
+    """
+    Check one roster row.
+    Returns (record, None) with a dict ready to insert, or (None, error message).
+    """
+    if not isinstance(row, dict):
+        return None, "Row must be an object with student_id, name, class and date"
+    if '__error__' in row:
+        return None, row['__error__']
+
+    row = normalize_keys(row)
+    record = {key: str(row.get(key) or '').strip()
+              for key in ('student_id', 'name', 'class_name', 'date')}
+
+    missing = [key for key, value in record.items() if not value]
+    if missing:
+        return None, f"Missing {', '.join(missing)}"
+
+    for key, limit in MAX_LENGTHS.items():
+        if len(record[key]) > limit:
+            return None, f"{key} is longer than {limit} characters"
+
+    record['date'] = parse_date(record['date'])
+    if not record['date']:
+        return None, "Date must be a valid date (YYYY-MM-DD)"
+
+    record['status'] = str(row.get('status') or 'present').strip().lower()
+    if record['status'] not in ATTENDANCE_STATUSES:
+        return None, f"Status must be {' or '.join(ATTENDANCE_STATUSES)}"
+
+    return record, None
+
+def import_rows(rows, insert_batch, batch_size=1000):
+    """
+    Validate (line number, row) pairs and insert the valid ones in batches.
+    insert_batch is called with a list of record dicts, must write them in one transaction
+    and returns how many records it wrote (it may leave some out).
+    Returns the number of records imported and a list of (line number, error) pairs.
+    """
+    imported, errors, batch = 0, [], []
+    for number, row in rows:
+        record, error = validate_row(row)
+        if error:
+            errors.append((number, error))
+            continue
+
+        batch.append(record)
+        if len(batch) >= batch_size:
+            imported += insert_batch(batch)
+            batch = []
+
+    if batch:
+        imported += insert_batch(batch)
+    return imported, errors
+
+def summarize_errors(errors, limit=10):
+    """Describe the first few row errors in one line for a message to the user."""
+    text = '; '.join(f"line {number}: {error}" for number, error in errors[:limit])
+    if len(errors) > limit:
+        text += f" (and {len(errors) - limit} more)"
+    return text
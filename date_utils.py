@@ -0,0 +1,26 @@
+"""
+Date handling shared by the web and desktop applications.
+Attendance dates are stored as ISO dates (YYYY-MM-DD), which sort and compare
+correctly as text in SQLite and convert directly to a DATE column elsewhere.
+"""
+
+from datetime import datetime
+
+# Format accepted from the forms (HTML date inputs and the desktop date picker)
+ISO_FORMAT = '%Y-%m-%d'
+
+# Formats older records may have been stored in, tried in order when converting them
+LEGACY_FORMATS = [ISO_FORMAT, '%Y/%m/%d', '%d-%m-%Y', '%d/%m/%Y', '%m/%d/%y']
+
+def parse_date(value, formats=(ISO_FORMAT,)):
+    """
+    Parse a date string using the first matching format.
+    Returns a datetime.date, or None if the value is empty or not a valid date.
+    """
+    value = (value or '').strip()
+    for date_format in formats:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    return None
@@ -0,0 +1,138 @@
+"""
+Background database thread for the desktop application.
+All SQL runs on one worker thread that owns its own sqlite3 connection, so the
+Tk main loop never waits on the database. Results are queued and handed back
+to callbacks on the main thread by process_results(), which the application
+calls from a root.after() loop (Tk widgets must only be touched from the main
+thread). Jobs submitted with a key replace any earlier job with the same key:
+an older job that has not started is skipped, one that is running is
+interrupted, and the result of either is never delivered. Errors of jobs
+without an on_error callback, and errors raised by the callbacks themselves,
+go to the worker's on_error (or the log), never out of process_results().
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+class Job:
+    """A unit of work: task(conn) runs on the worker, the callbacks on the main thread."""
+
+    def __init__(self, task, on_done, on_error, key):
+        self.task = task
+        self.on_done = on_done
+        self.on_error = on_error
+        self.key = key
+        self.cancelled = False
+
+class DatabaseWorker:
+    """Runs jobs one at a time, in order, on a thread with its own connection."""
+
+    def __init__(self, connect, on_error=None):
+        # Called with errors that no job callback handles (logged when None)
+        self.on_error = on_error
+        # Opened here so connection errors are reported to the caller; after this
+        # only the worker thread uses the connection
+        self.conn = connect()
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.lock = threading.Lock()
+        self.latest = {}
+        self.current = None
+        self.pending = 0
+        self.thread = threading.Thread(target=self.run, name="database", daemon=True)
+        self.thread.start()
+
+    @property
+    def busy(self):
+        """True while any submitted job has not been delivered yet."""
+        with self.lock:
+            return self.pending > 0
+
+    def submit(self, task, on_done=None, on_error=None, key=None):
+        """
+        Queue task(conn) to run on the worker thread.
+        on_done(result) or on_error(exception) is called from process_results().
+        A key (such as "records") cancels the previous job submitted with it.
+        """
+        job = Job(task, on_done, on_error, key)
+        with self.lock:
+            if key is not None:
+                stale = self.latest.get(key)
+                if stale is not None:
+                    stale.cancelled = True
+                    if stale is self.current:
+                        self.conn.interrupt()
+                self.latest[key] = job
+            self.pending += 1
+        self.jobs.put(job)
+        return job
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            with self.lock:
+                if not job.cancelled:
+                    self.current = job
+            result = error = None
+            if self.current is job:
+                try:
+                    result = job.task(self.conn)
+                except Exception as e:
+                    # Leave no half-finished transaction behind for the next job
+                    self.conn.rollback()
+                    error = e
+                with self.lock:
+                    self.current = None
+            self.results.put((job, result, error))
+        self.conn.close()
+
+    def process_results(self):
+        """Deliver finished jobs to their callbacks; call this from the main thread."""
+        while True:
+            try:
+                job, result, error = self.results.get_nowait()
+            except queue.Empty:
+                return
+            with self.lock:
+                self.pending -= 1
+                if job.key is not None and self.latest.get(job.key) is job:
+                    del self.latest[job.key]
+            if job.cancelled:
+                continue
+            try:
+                if error is not None:
+                    if job.on_error is None:
+                        raise error
+                    job.on_error(error)
+                elif job.on_done is not None:
+                    job.on_done(result)
+            except Exception as e:
+                self.report(e)
+
+    def report(self, error):
+        """Report an error nothing else handled, keeping the remaining results flowing."""
+        if self.on_error is not None:
+            try:
+                self.on_error(error)
+                return
+            except Exception:
+                pass
+        logger.error("Unhandled database job error", exc_info=error)
+
+    def close(self):
+        """Finish the queued jobs, then close the connection and stop the thread."""
+        self.jobs.put(None)
+        self.thread.join()
+
+def connect(path, configure=None):
+    """Open a connection that the worker thread may use, applying configure(conn) if given."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    if configure is not None:
+        configure(conn)
+    return conn
@@ -0,0 +1,191 @@
+"""
+Attendance report export formats.
+Each exporter takes an iterable of report rows (id, student_id, name, class_name, date, status)
+and yields the file in chunks, one per batch of rows, so a download starts at
+once and the rows are never all held in memory.
+Parquet, XLSX and zstd-compressed CSV need their optional packages installed.
+"""
+
+import csv
+import io
+import os
+import tempfile
+import zlib
+from itertools import islice
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+REPORT_HEADER = ['ID', 'Student ID', 'Name', 'Class', 'Date', 'Status']
+
+def batches(rows, batch_size):
+    """Group an iterable of rows into lists of at most batch_size rows."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def csv_chunks(rows, batch_size):
+    """Yield the report as CSV text, one chunk per batch of rows."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+
+    # Write header
+    writer.writerow(REPORT_HEADER)
+
+    # Write data
+    for batch in batches(rows, batch_size):
+        writer.writerows(batch)
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
+
+    yield output.getvalue()
+
+def gzip_csv_chunks(rows, batch_size):
+    """Yield the report as gzip-compressed CSV."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in csv_chunks(rows, batch_size):
+        yield compressor.compress(chunk.encode('utf-8'))
+    yield compressor.flush()
+
+def zstd_csv_chunks(rows, batch_size):
+    """Yield the report as zstd-compressed CSV."""
+    compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    for chunk in csv_chunks(rows, batch_size):
+        yield compressor.compress(chunk.encode('utf-8'))
+    yield compressor.flush()
+
+class _ChunkSink:
+    """
+    Write-only file object that hands out what was written since the last
+    call to take(), while tell() keeps counting from the start of the file.
+    """
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.buffer.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def take(self):
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+def parquet_chunks(rows, batch_size):
+    """Yield the report as a Parquet file with one row group per batch of rows."""
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('student_id', pa.string()),
+        ('name', pa.string()),
+        ('class_name', pa.string()),
+        ('date', pa.date32()),
+        ('status', pa.string()),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+
+    for batch in batches(rows, batch_size):
+        columns = [pa.array(values, type=field.type) for values, field in zip(zip(*batch), schema)]
+        writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+        yield sink.take()
+
+    writer.close()
+    yield sink.take()
+
+def xlsx_chunks(rows, batch_size):
+    """
+    Yield the report as an XLSX workbook.
+    Rows are written in openpyxl's write-only mode to a temporary file, which is
+    then sent in chunks (the zip container can only be finished at the end).
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Attendance')
+    sheet.append(REPORT_HEADER)
+    for row in rows:
+        sheet.append(tuple(row))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'report.xlsx')
+        workbook.save(path)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(64 * 1024)
+                if not chunk:
+                    break
+                yield chunk
+
+# report_type -> export details; 'available' is False when the optional package is missing
+EXPORT_FORMATS = {
+    'csv': {
+        'label': 'CSV Download',
+        'mimetype': 'text/csv',
+        'filename': 'attendance_report.csv',
+        'chunks': csv_chunks,
+        'available': True,
+    },
+    'csv_gzip': {
+        'label': 'CSV Download (gzip)',
+        'mimetype': 'application/gzip',
+        'filename': 'attendance_report.csv.gz',
+        'chunks': gzip_csv_chunks,
+        'available': True,
+    },
+    'csv_zstd': {
+        'label': 'CSV Download (zstd)',
+        'mimetype': 'application/zstd',
+        'filename': 'attendance_report.csv.zst',
+        'chunks': zstd_csv_chunks,
+        'available': zstandard is not None,
+        'requires': 'zstandard',
+    },
+    'parquet': {
+        'label': 'Parquet Download',
+        'mimetype': 'application/vnd.apache.parquet',
+        'filename': 'attendance_report.parquet',
+        'chunks': parquet_chunks,
+        'available': pa is not None,
+        'requires': 'pyarrow',
+    },
+    'xlsx': {
+        'label': 'Excel Download (XLSX)',
+        'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'filename': 'attendance_report.xlsx',
+        'chunks': xlsx_chunks,
+        'available': openpyxl is not None,
+        'requires': 'openpyxl',
+    },
+}
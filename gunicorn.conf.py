@@ -0,0 +1,44 @@
+"""
+Gunicorn configuration for running the web application in production.
+
+    gunicorn wsgi:app
+
+Every setting can be changed through the environment:
+
+    PORT / BIND                 address to listen on (default 0.0.0.0:5000)
+    WEB_CONCURRENCY             worker processes (default 2 per CPU + 1)
+    GUNICORN_THREADS            threads per worker (default 4; more than 1 uses gthread workers)
+    GUNICORN_KEEPALIVE          seconds to keep idle client connections open (default 5)
+    GUNICORN_TIMEOUT            seconds before a stuck worker is restarted (default 30)
+    GUNICORN_GRACEFUL_TIMEOUT   seconds workers get to finish requests on reload/stop (default 30)
+    GUNICORN_MAX_REQUESTS       restart a worker after this many requests (default 0, never)
+    GUNICORN_LOG_LEVEL          log level (default info)
+    GUNICORN_ACCESS_LOG         access log file (default - for stdout; empty to disable)
+
+Reload gracefully (new workers start, old ones finish their requests) with
+`kill -HUP <master pid>`; stop gracefully with SIGTERM.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+
+# Load the app (and apply pending migrations) once in the master process,
+# so workers start quickly and never run migrations concurrently
+preload_app = True
+
+def post_fork(server, worker):
+    """Give each worker its own database connections instead of the master's."""
+    from app import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)
@@ -0,0 +1,293 @@
+"""
+Schema migrations for the web application database.
+Migrations are applied in order at startup; the versions already applied are
+recorded in the schema_version table so each one runs exactly once.
+"""
+
+from sqlalchemy import MetaData, Table, Column, Integer, String, Date, DateTime, ForeignKey, Index, text
+from datetime import datetime, timezone
+import repository
+import search_index
+import summaries
+from date_utils import parse_date, LEGACY_FORMATS
+
+def baseline(conn):
+    """Create the original user and attendance tables (skipped if they already exist)."""
+    metadata = MetaData()
+    Table(
+        'user', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('username', String(80), unique=True, nullable=False),
+        Column('password_hash', String(128), nullable=False),
+        Column('role', String(20)),
+    )
+    Table(
+        'attendance', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('student_id', String(50), nullable=False),
+        Column('name', String(100), nullable=False),
+        Column('class_name', String(50), nullable=False),
+        Column('date', String(20), nullable=False),
+    )
+    metadata.create_all(conn)
+
+def create_search_index(conn):
+    """Create the full-text search index over attendance and fill it from existing rows."""
+    if conn.dialect.name != 'sqlite':
+        return
+
+    index_is_new = conn.exec_driver_sql(search_index.EXISTS_SQL).first() is None
+    for statement in search_index.SCHEMA_STATEMENTS:
+        conn.exec_driver_sql(statement)
+    if index_is_new:
+        conn.exec_driver_sql(search_index.REBUILD_SQL)
+
+def add_attendance_indexes(conn):
+    """Index attendance for report filters (class and date range) and per-student lookups."""
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_attendance_class_name_date ON attendance (class_name, date)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_attendance_student_id_date ON attendance (student_id, date)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_attendance_date ON attendance (date)"
+    )
+
+def normalize_attendance_dates(conn):
+    """
+    Convert every attendance date to ISO format (YYYY-MM-DD) so dates compare
+    correctly in range queries, then make the column a DATE where the database has one.
+    """
+    updates, invalid = [], []
+    for record_id, value in conn.exec_driver_sql("SELECT id, date FROM attendance"):
+        parsed = parse_date(value, LEGACY_FORMATS)
+        if parsed is None:
+            invalid.append(record_id)
+        elif parsed.isoformat() != value:
+            updates.append({'id': record_id, 'date': parsed.isoformat()})
+    
+    if invalid:
+        raise RuntimeError(
+            f"Cannot convert the date of attendance records {invalid[:20]}; fix them and restart"
+        )
+    if updates:
+        conn.execute(text("UPDATE attendance SET date = :date WHERE id = :id"), updates)
+    
+    # SQLite has no separate date type; ISO text is its native date format
+    if conn.dialect.name != 'sqlite':
+        conn.exec_driver_sql("ALTER TABLE attendance ALTER COLUMN date TYPE DATE USING date::date")
+
+def add_attendance_status(conn):
+    """
+    Record whether each student was present or absent (existing rows were all presences),
+    and index the class roster lookup used by roll call.
+    """
+    conn.exec_driver_sql(
+        "ALTER TABLE attendance ADD COLUMN status VARCHAR(10) NOT NULL DEFAULT 'present'"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_attendance_class_name_student_id "
+        "ON attendance (class_name, student_id)"
+    )
+    
+    # Only changes to the searchable columns need to touch the search index
+    if conn.dialect.name == 'sqlite':
+        conn.exec_driver_sql("DROP TRIGGER IF EXISTS attendance_fts_update")
+        for statement in search_index.SCHEMA_STATEMENTS:
+            conn.exec_driver_sql(statement)
+
+def normalize_students_and_classes(conn):
+    """
+    Move student names and class names out of attendance into student and
+    class_section tables, storing each once; attendance keeps integer keys to them.
+    Each student gets the name and class of their latest record.
+    """
+    metadata = MetaData()
+    Table(
+        'class_section', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('name', String(50), unique=True, nullable=False),
+    )
+    Table(
+        'student', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('student_id', String(50), unique=True, nullable=False),
+        Column('name', String(100), nullable=False),
+        Column('class_id', Integer, ForeignKey('class_section.id')),
+        Index('ix_student_class_id_student_id', 'class_id', 'student_id'),
+    )
+    metadata.create_all(conn)
+    
+    for name in repository.DEFAULT_CLASSES:
+        conn.execute(
+            text("INSERT INTO class_section (name) SELECT :name "
+                 "WHERE NOT EXISTS (SELECT 1 FROM class_section WHERE name = :name)"),
+            {'name': name}
+        )
+    conn.exec_driver_sql("""
+        INSERT INTO class_section (name)
+        SELECT DISTINCT class_name FROM attendance
+        WHERE class_name NOT IN (SELECT name FROM class_section)
+    """)
+    conn.exec_driver_sql("""
+        INSERT INTO student (student_id, name, class_id)
+        SELECT attendance.student_id, attendance.name, class_section.id
+        FROM attendance
+        JOIN class_section ON class_section.name = attendance.class_name
+        WHERE attendance.id IN (SELECT MAX(id) FROM attendance GROUP BY student_id)
+    """)
+    
+    # Remove the search index and the indexes that use the old columns
+    if conn.dialect.name == 'sqlite':
+        for statement in search_index.DROP_STATEMENTS:
+            conn.exec_driver_sql(statement)
+    for index in ('ix_attendance_class_name_date', 'ix_attendance_student_id_date',
+                  'ix_attendance_class_name_student_id'):
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index}")
+    
+    # Replace the name columns with keys (DROP COLUMN needs SQLite 3.35 or newer)
+    conn.exec_driver_sql("ALTER TABLE attendance ADD COLUMN student_pk INTEGER REFERENCES student (id)")
+    conn.exec_driver_sql("ALTER TABLE attendance ADD COLUMN class_id INTEGER REFERENCES class_section (id)")
+    conn.exec_driver_sql("""
+        UPDATE attendance SET student_pk = student.id
+        FROM student WHERE student.student_id = attendance.student_id
+    """)
+    conn.exec_driver_sql("""
+        UPDATE attendance SET class_id = class_section.id
+        FROM class_section WHERE class_section.name = attendance.class_name
+    """)
+    for column in ('student_id', 'name', 'class_name'):
+        conn.exec_driver_sql(f"ALTER TABLE attendance DROP COLUMN {column}")
+    if conn.dialect.name != 'sqlite':
+        conn.exec_driver_sql("ALTER TABLE attendance ALTER COLUMN student_pk SET NOT NULL")
+        conn.exec_driver_sql("ALTER TABLE attendance ALTER COLUMN class_id SET NOT NULL")
+    
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_attendance_class_id_date ON attendance (class_id, date)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_attendance_student_pk_date ON attendance (student_pk, date)"
+    )
+    
+    if conn.dialect.name == 'sqlite':
+        for statement in search_index.NORMALIZED_SCHEMA_STATEMENTS:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(search_index.REBUILD_SQL)
+
+def add_attendance_summaries(conn):
+    """
+    Create the per student per month and per class per day attendance count
+    tables used by the summary reports, and fill them from existing records.
+    """
+    metadata = MetaData()
+    metadata.reflect(conn, only=['class_section', 'student'])
+    Table(
+        'student_month_summary', metadata,
+        Column('class_id', Integer, ForeignKey('class_section.id'), primary_key=True),
+        Column('month', Date, primary_key=True),
+        Column('student_pk', Integer, ForeignKey('student.id'), primary_key=True),
+        Column('present', Integer, nullable=False, default=0),
+        Column('absent', Integer, nullable=False, default=0),
+        Index('ix_student_month_summary_month', 'month'),
+    )
+    Table(
+        'class_day_summary', metadata,
+        Column('class_id', Integer, ForeignKey('class_section.id'), primary_key=True),
+        Column('date', Date, primary_key=True),
+        Column('present', Integer, nullable=False, default=0),
+        Column('absent', Integer, nullable=False, default=0),
+        Index('ix_class_day_summary_date', 'date'),
+    )
+    metadata.create_all(conn)
+    summaries.rebuild(conn)
+
+def add_data_version(conn):
+    """
+    Create the data_version table: a counter per kind of data, bumped by every
+    write, that keys cached responses and ETags.
+    """
+    metadata = MetaData()
+    data_version = Table(
+        'data_version', metadata,
+        Column('name', String(50), primary_key=True),
+        Column('version', Integer, nullable=False),
+        Column('updated_at', DateTime, nullable=False),
+    )
+    metadata.create_all(conn)
+    conn.execute(data_version.insert().values(
+        name='attendance', version=1, updated_at=datetime.now(timezone.utc).replace(tzinfo=None)))
+
+def add_attendance_class_id_index(conn):
+    """Index attendance by class and id for paging through a class's records newest first."""
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_attendance_class_id_id ON attendance (class_id, id)"
+    )
+
+def widen_password_hash(conn):
+    """
+    Make room for scrypt password hashes (about 160 characters). SQLite does not
+    enforce VARCHAR lengths, so only other databases need the column changed.
+    """
+    if conn.dialect.name != 'sqlite':
+        conn.exec_driver_sql('ALTER TABLE "user" ALTER COLUMN password_hash TYPE VARCHAR(255)')
+
+# (version, description, function) in the order they must be applied
+MIGRATIONS = [
+    (1, 'Create user and attendance tables', baseline),
+    (2, 'Create attendance full-text search index', create_search_index),
+    (3, 'Add attendance report and student indexes', add_attendance_indexes),
+    (4, 'Store attendance dates as ISO dates', normalize_attendance_dates),
+    (5, 'Add attendance status for roll call', add_attendance_status),
+    (6, 'Move students and classes into their own tables', normalize_students_and_classes),
+    (7, 'Add attendance summary tables', add_attendance_summaries),
+    (8, 'Add data version counter for response caching', add_data_version),
+    (9, 'Add attendance class and id index for API paging', add_attendance_class_id_index),
+    (10, 'Widen user password hash column', widen_password_hash),
+]
+
+def current_version(conn):
+    """Return the highest applied migration version (0 for a new database)."""
+    conn.exec_driver_sql("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+    return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+# Key of the PostgreSQL advisory lock held while migrating
+MIGRATION_LOCK_ID = 20250516
+
+def upgrade(engine):
+    """
+    Apply all pending migrations, each in its own transaction.
+    Returns the list of versions that were applied.
+    On PostgreSQL an advisory lock makes processes starting at the same time
+    migrate one after the other; the later ones then find nothing to apply.
+    SQLite databases are local to one host, where the gunicorn master migrates
+    before starting workers (preload_app).
+    """
+    with engine.connect() as lock_conn:
+        if engine.dialect.name == 'postgresql':
+            lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {'id': MIGRATION_LOCK_ID})
+            lock_conn.commit()
+        try:
+            return apply_pending(engine)
+        finally:
+            if engine.dialect.name == 'postgresql':
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {'id': MIGRATION_LOCK_ID})
+                lock_conn.commit()
+
+def apply_pending(engine):
+    """Apply the migrations newer than the database's version."""
+    with engine.begin() as conn:
+        version = current_version(conn)
+
+    applied = []
+    for migration_version, description, migrate in MIGRATIONS:
+        if migration_version <= version:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(
+                text("INSERT INTO schema_version (version) VALUES (:version)"),
+                {'version': migration_version}
+            )
+        applied.append(migration_version)
+    return applied
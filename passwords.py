@@ -0,0 +1,51 @@
+"""
+Password hashing with configurable parameters.
+Hashes use werkzeug's format, which stores the method and its parameters
+(such as scrypt:32768:8:1) in front of the salt, so hashes made with older
+parameters can be recognised and replaced the next time the user logs in.
+
+Hashing is deliberately slow and runs on a small thread pool: a burst of
+logins then uses at most `threads` CPUs per process for hashing, and the
+request threads waiting on it stay free of the work (hashlib releases the GIL
+while hashing).
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+class PasswordHasher:
+    """Hashes and checks passwords with one method on a per-process thread pool."""
+
+    def __init__(self, method='scrypt:32768:8:1', threads=2):
+        self.method = method
+        self.threads = threads
+        self.lock = threading.Lock()
+        self.pool = None
+        self.pool_pid = None
+        self.prefix = None
+
+    @property
+    def executor(self):
+        # Threads do not survive a fork, so each (gunicorn) worker starts its own pool
+        with self.lock:
+            if self.pool_pid != os.getpid():
+                self.pool = ThreadPoolExecutor(max_workers=self.threads,
+                                               thread_name_prefix='password-hash')
+                self.pool_pid = os.getpid()
+            return self.pool
+
+    def hash(self, password):
+        return self.executor.submit(generate_password_hash, password, self.method).result()
+
+    def verify(self, password_hash, password):
+        return self.executor.submit(check_password_hash, password_hash, password).result()
+
+    def needs_rehash(self, password_hash):
+        """True if password_hash was made with other parameters than the configured ones."""
+        if self.prefix is None:
+            # The method with werkzeug's defaults filled in (scrypt -> scrypt:32768:8:1)
+            self.prefix = self.hash('').split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self.prefix
@@ -0,0 +1,70 @@
+"""
+Sliding-window rate limiting.
+A limiter allows a number of hits per key (a username, an IP address) within
+the last `window` seconds. The application only uses these three methods, so
+a limiter shared by all worker processes (backed by Redis or the database,
+say) can replace the in-process one:
+
+    limiter.retry_after(key)   -> seconds until the key may be hit again (0 if now)
+    limiter.hit(key)           record a hit
+    limiter.reset(key)         forget the key's hits
+"""
+
+import threading
+import time
+from collections import deque
+
+class SlidingWindowLimiter:
+    """Thread-safe in-process limiter allowing limit hits per key in any window seconds."""
+
+    def __init__(self, limit, window, max_keys=100000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        # key -> times of its hits within the window, oldest first
+        self.hits = {}
+        self.lock = threading.Lock()
+
+    def retry_after(self, key):
+        now = time.monotonic()
+        with self.lock:
+            hits = self._recent(key, now)
+            if self.limit <= 0 or hits is None or len(hits) < self.limit:
+                return 0
+            return hits[len(hits) - self.limit] + self.window - now
+
+    def hit(self, key):
+        now = time.monotonic()
+        with self.lock:
+            hits = self._recent(key, now)
+            if hits is None:
+                if len(self.hits) >= self.max_keys:
+                    self._evict(now)
+                hits = self.hits[key] = deque()
+            hits.append(now)
+            # Hits beyond the limit never matter again
+            while len(hits) > max(self.limit, 1):
+                hits.popleft()
+
+    def reset(self, key):
+        with self.lock:
+            self.hits.pop(key, None)
+
+    def _recent(self, key, now):
+        """Return the key's hits after dropping those older than the window (None if none are left)."""
+        hits = self.hits.get(key)
+        if hits is None:
+            return None
+        while hits and hits[0] <= now - self.window:
+            hits.popleft()
+        if not hits:
+            del self.hits[key]
+            return None
+        return hits
+
+    def _evict(self, now):
+        # Drop keys whose hits have all expired, then the oldest keys if still full
+        for key in [key for key, hits in self.hits.items() if hits[-1] <= now - self.window]:
+            del self.hits[key]
+        while len(self.hits) >= self.max_keys:
+            del self.hits[next(iter(self.hits))]
@@ -0,0 +1,243 @@
+"""
+Data access shared by the web and desktop applications.
+Both keep attendance records in an `attendance` table with an integer id, the
+full-text index from search_index and a `class_section` table, but lay out the
+other record fields differently (the web application keeps students and classes
+in their own tables). A RecordSet holds the SELECT that reads records in one
+layout, and the queries built on it (paging, ranked search, lookups by id) are
+written once for both applications. The desktop application's inserts,
+updates and deletes are kept here as well, next to the reads they must match.
+
+Every function takes either a sqlite3 connection (desktop) or a SQLAlchemy
+connection or session (web). Statements use named parameters and are built
+once per SQL string, so both sqlite3's prepared statement cache and
+SQLAlchemy's compiled statement cache are reused from call to call.
+"""
+
+import re
+import sqlite3
+from functools import lru_cache
+
+from sqlalchemy import text
+
+import search_index
+
+# Attendance status values; a record without an explicit status is a presence
+ATTENDANCE_STATUSES = ['present', 'absent']
+
+# Classes both applications started with, created first so they keep their order
+DEFAULT_CLASSES = ["I-MCA-A", "II-MCA-A", "I-MCA-B", "II-MCA-B"]
+
+# Fields of a record, in column order
+RECORD_FIELDS = ['id', 'student_id', 'name', 'class_name', 'date', 'status']
+
+# Record ids are SQLite rowids (bigints on PostgreSQL): positive signed 64-bit integers
+MAX_RECORD_ID = 2 ** 63 - 1
+
+COUNT_SQL = "SELECT COUNT(*) FROM attendance"
+
+CLASS_NAMES_SQL = "SELECT name FROM class_section ORDER BY id"
+
+# Works on SQLite (3.24+) and PostgreSQL; concurrent writers adding the same class do not fail
+ADD_CLASS_SQL = "INSERT INTO class_section (name) VALUES (:name) ON CONFLICT (name) DO NOTHING"
+
+@lru_cache(maxsize=256)
+def statement(sql):
+    """Return the SQLAlchemy statement for sql, built once per SQL string."""
+    return text(sql)
+
+def execute(conn, sql, params=None):
+    """Run sql with named parameters and return all result rows."""
+    if isinstance(conn, sqlite3.Connection):
+        return conn.execute(sql, params or {}).fetchall()
+    return conn.execute(statement(sql), params or {}).all()
+
+def execute_many(conn, sql, rows):
+    """Run sql once per dict of parameters in rows, as one batch."""
+    if not rows:
+        return
+    if isinstance(conn, sqlite3.Connection):
+        conn.executemany(sql, rows)
+    else:
+        conn.execute(statement(sql), rows)
+
+def parse_id(value):
+    """Return the record id written in value (ASCII digits), or None if it is not a valid id."""
+    if not isinstance(value, str) or not re.fullmatch(r'[0-9]{1,19}', value):
+        return None
+    record_id = int(value)
+    return record_id if 0 < record_id <= MAX_RECORD_ID else None
+
+def in_list(name, values):
+    """Return the placeholders and parameters for `IN (...)` over values."""
+    params = {f"{name}_{i}": value for i, value in enumerate(values)}
+    return ', '.join(f":{key}" for key in params), params
+
+class RecordSet:
+    """
+    Queries over attendance records in one table layout. select_sql reads the
+    RECORD_FIELDS columns from `attendance` (joined to whatever holds the other
+    fields) without a WHERE clause. Records are listed newest first.
+    """
+
+    def __init__(self, select_sql):
+        self.select_sql = select_sql
+        self.page_sql = self.page_query([])
+        self.page_before_sql = self.page_query(["attendance.id < :before"])
+        self.window_sql = f"{select_sql} ORDER BY attendance.id DESC LIMIT :limit OFFSET :offset"
+
+    def page_query(self, conditions):
+        """Return the SQL reading a page of the records matching all of the SQL conditions."""
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f"{self.select_sql}{where} ORDER BY attendance.id DESC LIMIT :limit"
+
+    def page(self, conn, before=None, limit=50, conditions=(), params=None):
+        """
+        Fetch one page of records using keyset pagination on id, optionally only
+        those matching all of the SQL conditions (their named parameters in params).
+        Returns the records and the cursor for the next page (None on the last page).
+        """
+        conditions = list(conditions)
+        # Fetch one extra row to know whether another page exists
+        params = {**(params or {}), 'limit': limit + 1}
+        if before:
+            conditions.append("attendance.id < :before")
+            params['before'] = before
+        records = execute(conn, self.page_query(conditions), params)
+        if len(records) > limit:
+            records = records[:limit]
+            return records, records[-1][0]
+        return records, None
+
+    def window(self, conn, offset, limit):
+        """Fetch limit records starting at position offset (for views that jump around)."""
+        return execute(conn, self.window_sql, {'offset': offset, 'limit': limit})
+
+    def ids_query(self, ids):
+        """Return the SQL and parameters reading the records with the given ids."""
+        placeholders, params = in_list('id', ids)
+        return f"{self.select_sql} WHERE attendance.id IN ({placeholders})", params
+
+    def by_ids(self, conn, ids):
+        """Fetch the records with the given ids, in the order of ids (missing ones are skipped)."""
+        if not ids:
+            return []
+        records = {record[0]: record for record in execute(conn, *self.ids_query(ids))}
+        return [records[record_id] for record_id in ids if record_id in records]
+
+    def search_page(self, conn, search_term, cursor=None, limit=50):
+        """
+        Fetch one page of full-text search results, best match first, or newest
+        first for broad searches (SQLite only).
+        Returns the records and the cursor for the next page (None on the last page).
+        """
+        match = search_index.match_expression(search_term)
+        if match is None:
+            return [], None
+
+        params = {'query': match, 'limit': limit + 1}
+        after = search_index.decode_cursor(cursor)
+        if after:
+            # The cursor tells whether the first page was ranked (a score of 0 is not)
+            params['score'], params['id'] = after
+            sql = search_index.SEARCH_AFTER_SQL if after[0] else search_index.RECENT_AFTER_SQL
+        else:
+            params['offset'] = 0
+            sql = search_index.SEARCH_SQL if ranked(conn, match) else search_index.RECENT_SQL
+        rows = execute(conn, sql, params)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = search_index.encode_cursor(rows[-1][1], rows[-1][0])
+        return self.by_ids(conn, [row[0] for row in rows]), next_cursor
+
+    def search_window(self, conn, search_term, offset, limit, ranked=True):
+        """
+        Fetch limit search results starting at position offset, best match first,
+        or newest first if not ranked (for views that jump around; SQLite only).
+        """
+        match = search_index.match_expression(search_term)
+        if match is None:
+            return []
+        sql = search_index.SEARCH_SQL if ranked else search_index.RECENT_SQL
+        rows = execute(conn, sql, {'query': match, 'offset': offset, 'limit': limit})
+        return self.by_ids(conn, [row[0] for row in rows])
+
+# The desktop application's single table, which only records presences
+RECORDS = RecordSet(
+    "SELECT id, student_id, name, class AS class_name, date, 'present' AS status FROM attendance"
+)
+
+# Writes to the desktop application's table; records are dicts with
+# student_id, name, class_name and date (an ISO date string)
+INSERT_RECORD_SQL = """
+    INSERT INTO attendance (student_id, name, class, date)
+    VALUES (:student_id, :name, :class_name, :date)
+"""
+
+UPDATE_RECORD_SQL = """
+    UPDATE attendance
+    SET student_id = :student_id, name = :name, class = :class_name, date = :date
+    WHERE id = :id
+"""
+
+# Both applications' attendance tables
+DELETE_RECORD_SQL = "DELETE FROM attendance WHERE id = :id"
+
+# The web application's tables, with students and classes stored once each
+NORMALIZED_RECORDS = RecordSet("""
+    SELECT attendance.id, student.student_id, student.name,
+           class_section.name AS class_name, attendance.date, attendance.status
+    FROM attendance
+    JOIN student ON student.id = attendance.student_pk
+    JOIN class_section ON class_section.id = attendance.class_id
+""".strip())
+
+def ranked(conn, match):
+    """True if few enough records match an FTS5 query to rank them by relevance quickly."""
+    limit = search_index.RANK_LIMIT
+    return execute(conn, search_index.COUNT_SQL, {'query': match, 'limit': limit})[0][0] < limit
+
+def count_records(conn):
+    return execute(conn, COUNT_SQL)[0][0]
+
+def count_matches(conn, search_term, limit):
+    """Return the number of records matching search_term, counting no further than limit (SQLite only)."""
+    match = search_index.match_expression(search_term)
+    if match is None:
+        return 0
+    return execute(conn, search_index.COUNT_SQL, {'query': match, 'limit': limit})[0][0]
+
+def class_names(conn):
+    """Return the names of all classes, in the order they were added."""
+    return [row[0] for row in execute(conn, CLASS_NAMES_SQL)]
+
+def add_classes(conn, names):
+    """Add the classes that do not exist yet (the caller commits)."""
+    execute_many(conn, ADD_CLASS_SQL, [{'name': name} for name in names])
+
+def insert_record(conn, record):
+    """Add a record to the desktop table and return its id (the caller commits)."""
+    if isinstance(conn, sqlite3.Connection):
+        return conn.execute(INSERT_RECORD_SQL, record).lastrowid
+    return conn.execute(statement(INSERT_RECORD_SQL), record).lastrowid
+
+def insert_records(conn, records):
+    """Add records to the desktop table as one batch (the caller commits)."""
+    execute_many(conn, INSERT_RECORD_SQL, records)
+
+def update_record(conn, record_id, record):
+    """Replace the fields of a record in the desktop table (the caller commits)."""
+    execute_many(conn, UPDATE_RECORD_SQL, [{**record, 'id': record_id}])
+
+def delete_record(conn, record_id):
+    """Delete a record by id (the caller commits)."""
+    execute_many(conn, DELETE_RECORD_SQL, [{'id': record_id}])
+
+def record_dict(record):
+    """Return a record (a SQLAlchemy row or a model object) as a dict with an ISO date."""
+    data = {field: getattr(record, field) for field in RECORD_FIELDS}
+    if hasattr(data['date'], 'isoformat'):
+        data['date'] = data['date'].isoformat()
+    return data
@@ -0,0 +1,125 @@
+"""
+In-process request metrics in the Prometheus text format.
+Request latency, SQL query time and template render time are recorded in
+histograms (cumulative counts per upper bound, plus a sum and a count), which
+the /metrics endpoint renders for Prometheus to scrape. Each worker process
+keeps its own metrics, so with several gunicorn workers a scrape sees the
+process that answered it; rates and percentiles over time are still right,
+as every worker is sampled.
+"""
+
+import bisect
+import threading
+
+# Upper bounds in seconds, from a fast cached page to a large report
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Observations bucketed by upper bound, for each combination of label values."""
+
+    def __init__(self, name, help_text, labels, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [count per bucket (the last for +Inf), sum]
+        self.series = {}
+
+    def observe(self, values, amount):
+        series = self.series.get(values)
+        if series is None:
+            series = self.series[values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, amount)] += 1
+        series[1] += amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total) in sorted(self.series.items()):
+            labels = format_labels(self.labels, values)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+class Counter:
+    """A count that only goes up, for each combination of label values."""
+
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.series = {}
+
+    def inc(self, values, amount=1):
+        self.series[values] = self.series.get(values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for values, total in sorted(self.series.items()):
+            lines.append(f"{self.name}{{{format_labels(self.labels, values)}}} {total}")
+        return lines
+
+def format_labels(names, values):
+    return ','.join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+class RequestMetrics:
+    """Thread-safe collection of the application's metrics."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = Histogram('http_request_duration_seconds',
+                                  'Time to handle a request, by route.',
+                                  ('method', 'route', 'status'))
+        self.request_queries = Histogram('http_request_sql_queries',
+                                         'SQL queries run while handling a request, by route.',
+                                         ('route',), buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100))
+        self.queries = Histogram('sql_query_duration_seconds',
+                                 'Time to execute a SQL statement, by statement type.',
+                                 ('operation',))
+        self.slow_queries = Counter('sql_slow_queries_total',
+                                    'SQL statements slower than the slow query threshold.',
+                                    ('operation',))
+        self.templates = Histogram('template_render_duration_seconds',
+                                   'Time to render a template (including its includes).',
+                                   ('template',))
+        self.cache_events = Counter('response_cache_events_total',
+                                    'Response cache lookups and other cache events.', ('event',))
+
+    def observe_request(self, method, route, status, seconds, queries):
+        with self.lock:
+            self.requests.observe((method, route, str(status)), seconds)
+            self.request_queries.observe((route,), queries)
+
+    def observe_query(self, operation, seconds, slow=False):
+        with self.lock:
+            self.queries.observe((operation,), seconds)
+            if slow:
+                self.slow_queries.inc((operation,))
+
+    def observe_template(self, template, seconds):
+        with self.lock:
+            self.templates.observe((template,), seconds)
+
+    def render(self, cache_stats=None):
+        """Return the metrics as a Prometheus text exposition, with the response cache's counters."""
+        with self.lock:
+            self.cache_events.series = {
+                (event,): count for event, count in (cache_stats or {}).items()
+                if event not in ('entries', 'bytes', 'hit_ratio')
+            }
+            lines = []
+            for metric in (self.requests, self.request_queries, self.queries,
+                           self.slow_queries, self.templates, self.cache_events):
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+def operation(statement):
+    """Return the statement type (SELECT, INSERT, ...) of a SQL statement."""
+    words = statement.split(None, 1)
+    return words[0].upper() if words else ''
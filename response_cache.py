@@ -0,0 +1,87 @@
+"""
+Caching of rendered pages and fragments.
+Cached output is keyed on the request's parameters together with the attendance
+data version, a counter stored in the database and bumped by every write, so
+entries never need invalidating: a write changes the version, and from then on
+requests use new keys (old entries age out of the LRU). The same keys serve as
+ETags, letting browsers revalidate a page with a 304 Not Modified response.
+"""
+
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+
+def make_etag(*parts):
+    """Build an ETag from the data version and the parameters that shape a response."""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+def value_size(value):
+    """Approximate size in bytes of a cached value (a string, or a tuple holding strings)."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, tuple):
+        return sum(value_size(part) for part in value)
+    return 0
+
+class FragmentCache:
+    """
+    Thread-safe LRU cache of rendered output, counting hits and misses.
+    Bounded both by number of entries and by total size; output larger than
+    max_entry_bytes (such as a report over every class and date) is not kept.
+    """
+
+    def __init__(self, max_size=256, max_bytes=32 * 1024 * 1024, max_entry_bytes=1024 * 1024):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        # key -> (value, size)
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.stats = Counter()
+
+    def get_or_render(self, key, render):
+        """Return the cached value for key, calling render() to create it on a miss."""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return self.entries[key][0]
+            self.stats['misses'] += 1
+
+        # Render outside the lock; two requests may render the same key at once
+        value = render()
+        size = value_size(value)
+        with self.lock:
+            if size > self.max_entry_bytes:
+                self.stats['too_large'] += 1
+                return value
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while len(self.entries) > self.max_size or self.bytes > self.max_bytes:
+                self.bytes -= self.entries.popitem(last=False)[1][1]
+        return value
+
+    def clear(self):
+        """Drop every entry (the counters are kept)."""
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def count(self, event):
+        """Count an event that is not a cache lookup, such as a 304 response."""
+        with self.lock:
+            self.stats[event] += 1
+
+    def metrics(self):
+        """Return the hit/miss counters, the hit ratio and the number of entries."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self.entries)
+            stats['bytes'] = self.bytes
+        lookups = stats.get('hits', 0) + stats.get('misses', 0)
+        stats['hit_ratio'] = round(stats.get('hits', 0) / lookups, 3) if lookups else None
+        return stats
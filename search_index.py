@@ -0,0 +1,200 @@
+"""
+Full-text search index for attendance records.
+Both the web application and the desktop application keep an SQLite FTS5
+index over the student name, student_id and date of each attendance record,
+kept in sync with their tables by triggers.
+"""
+
+import math
+
+# Statements creating the index and its triggers for an attendance table that
+# holds the name and student_id itself (the desktop application's table)
+SCHEMA_STATEMENTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS attendance_fts USING fts5(
+        name, student_id, date,
+        content='attendance', content_rowid='id',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS attendance_fts_insert AFTER INSERT ON attendance BEGIN
+        INSERT INTO attendance_fts (rowid, name, student_id, date)
+        VALUES (new.id, new.name, new.student_id, new.date);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS attendance_fts_delete AFTER DELETE ON attendance BEGIN
+        INSERT INTO attendance_fts (attendance_fts, rowid, name, student_id, date)
+        VALUES ('delete', old.id, old.name, old.student_id, old.date);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS attendance_fts_update
+    AFTER UPDATE OF name, student_id, date ON attendance BEGIN
+        INSERT INTO attendance_fts (attendance_fts, rowid, name, student_id, date)
+        VALUES ('delete', old.id, old.name, old.student_id, old.date);
+        INSERT INTO attendance_fts (rowid, name, student_id, date)
+        VALUES (new.id, new.name, new.student_id, new.date);
+    END
+    """,
+]
+
+# Statements creating the index and its triggers when attendance refers to a
+# student table for the name and student_id (the web application's tables)
+NORMALIZED_SCHEMA_STATEMENTS = [
+    """
+    CREATE VIEW IF NOT EXISTS attendance_search AS
+    SELECT attendance.id AS id, student.name AS name,
+           student.student_id AS student_id, attendance.date AS date
+    FROM attendance
+    JOIN student ON student.id = attendance.student_pk
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS attendance_fts USING fts5(
+        name, student_id, date,
+        content='attendance_search', content_rowid='id',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS attendance_fts_insert AFTER INSERT ON attendance BEGIN
+        INSERT INTO attendance_fts (rowid, name, student_id, date)
+        SELECT new.id, student.name, student.student_id, new.date
+        FROM student WHERE student.id = new.student_pk;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS attendance_fts_delete AFTER DELETE ON attendance BEGIN
+        INSERT INTO attendance_fts (attendance_fts, rowid, name, student_id, date)
+        SELECT 'delete', old.id, student.name, student.student_id, old.date
+        FROM student WHERE student.id = old.student_pk;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS attendance_fts_update
+    AFTER UPDATE OF student_pk, date ON attendance BEGIN
+        INSERT INTO attendance_fts (attendance_fts, rowid, name, student_id, date)
+        SELECT 'delete', old.id, student.name, student.student_id, old.date
+        FROM student WHERE student.id = old.student_pk;
+        INSERT INTO attendance_fts (rowid, name, student_id, date)
+        SELECT new.id, student.name, student.student_id, new.date
+        FROM student WHERE student.id = new.student_pk;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS student_fts_update
+    AFTER UPDATE OF name, student_id ON student BEGIN
+        INSERT INTO attendance_fts (attendance_fts, rowid, name, student_id, date)
+        SELECT 'delete', attendance.id, old.name, old.student_id, attendance.date
+        FROM attendance WHERE attendance.student_pk = old.id;
+        INSERT INTO attendance_fts (rowid, name, student_id, date)
+        SELECT attendance.id, new.name, new.student_id, attendance.date
+        FROM attendance WHERE attendance.student_pk = new.id;
+    END
+    """,
+]
+
+# Statements removing the index and its triggers
+DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS attendance_fts_insert",
+    "DROP TRIGGER IF EXISTS attendance_fts_delete",
+    "DROP TRIGGER IF EXISTS attendance_fts_update",
+    "DROP TRIGGER IF EXISTS student_fts_update",
+    "DROP TABLE IF EXISTS attendance_fts",
+    "DROP VIEW IF EXISTS attendance_search",
+]
+
+# Check whether the index exists yet (it must be filled once after creation)
+EXISTS_SQL = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'attendance_fts'"
+
+# Fill the index from the rows already in the attendance table
+REBUILD_SQL = "INSERT INTO attendance_fts (attendance_fts) VALUES ('rebuild')"
+
+# Shorter words are left out of searches: a one-character prefix is not in the
+# prefix index (prefix='2 3') and matches nearly every record
+MIN_WORD_LENGTH = 2
+
+# Searches matching at least this many records are listed newest first instead
+# of ranked: bm25 reads every match first, which takes seconds for a common
+# prefix at millions of records (and ranks such broad matches by little more
+# than word counts). Counting up to the limit stops early, so it stays cheap.
+RANK_LIMIT = 2000
+
+# Number of records matching a query, counting no further than :limit
+COUNT_SQL = """
+    SELECT COUNT(*) FROM (
+        SELECT rowid FROM attendance_fts WHERE attendance_fts MATCH :query LIMIT :limit
+    )
+"""
+
+# Matching record ids, best match first (lower bm25 is better) and newest first on ties
+SEARCH_SQL = """
+    SELECT rowid, bm25(attendance_fts) AS score
+    FROM attendance_fts
+    WHERE attendance_fts MATCH :query
+    ORDER BY score, rowid DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+# Same as SEARCH_SQL, continuing after the (score, id) of the last row of the previous page
+SEARCH_AFTER_SQL = """
+    SELECT rowid, score FROM (
+        SELECT rowid, bm25(attendance_fts) AS score
+        FROM attendance_fts
+        WHERE attendance_fts MATCH :query
+    )
+    WHERE score > :score OR (score = :score AND rowid < :id)
+    ORDER BY score, rowid DESC
+    LIMIT :limit
+"""
+
+# Matching record ids newest first, for broad searches (RANK_LIMIT or more
+# matches); the score is 0, which bm25 never returns, so cursors tell the two apart
+RECENT_SQL = """
+    SELECT rowid, 0.0 AS score
+    FROM attendance_fts
+    WHERE attendance_fts MATCH :query
+    ORDER BY rowid DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+# Same as RECENT_SQL, continuing after the id of the last row of the previous page
+RECENT_AFTER_SQL = """
+    SELECT rowid, 0.0 AS score
+    FROM attendance_fts
+    WHERE attendance_fts MATCH :query AND rowid < :id
+    ORDER BY rowid DESC
+    LIMIT :limit
+"""
+
+def search_words(search_term):
+    """Return the words of a search term long enough to search for."""
+    return [word for word in search_term.split() if len(word) >= MIN_WORD_LENGTH]
+
+def match_expression(search_term):
+    """
+    Convert a user search term into an FTS5 query (None if no word is long enough).
+    Every word becomes a quoted prefix match, so "jee 2025-05" finds records
+    whose words start with "jee" and that have a date starting with 2025-05.
+    """
+    words = search_words(search_term)
+    if not words:
+        return None
+    return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+def encode_cursor(score, record_id):
+    """Build the opaque next-page cursor for a ranked search."""
+    return f"{score!r}:{record_id}"
+
+def decode_cursor(cursor):
+    """Split a ranked search cursor into (score, id); returns None if it is malformed."""
+    try:
+        score, record_id = cursor.split(':')
+        score, record_id = float(score), int(record_id)
+    except (AttributeError, ValueError):
+        return None
+    # Ids are SQLite rowids (signed 64-bit), and no search scores inf or nan
+    if not (math.isfinite(score) and 0 < record_id < 2 ** 63):
+        return None
+    return score, record_id
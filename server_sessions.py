@@ -0,0 +1,255 @@
+"""
+Server-side sessions.
+With a store configured, the session cookie holds only a random session id;
+the session's contents (the logged-in user, flashed messages) stay on the
+server. Requests then send a short cookie that needs no signature check, and
+an account's sessions can be ended at once by deleting them from the store.
+
+Stores (all keep sessions until SESSION_LIFETIME seconds after their last use):
+
+    sqlite      an SQLite file shared by all worker processes
+    filesystem  one file per session in a directory shared by all workers
+    memory      a dict in the process (a single worker process only)
+
+Expired sessions are swept by whichever request comes along once the sweep
+interval has passed, so no background thread is needed.
+"""
+
+import json
+import os
+import re
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+from werkzeug.datastructures import CallbackDict
+
+import sqlite_tuning
+
+# Session ids are 32 random bytes, URL-safe base64 encoded
+SESSION_ID = re.compile(r'^[A-Za-z0-9_-]{43}$')
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """A session whose contents are kept in a store under sid."""
+
+    def __init__(self, initial=None, sid=None, expires=None):
+        def on_update(session):
+            session.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.expires = expires
+        # The account the stored session belongs to, to notice logins and logouts
+        self.stored_user_id = self.get('user_id')
+        self.modified = False
+
+class MemoryStore:
+    """Sessions in a dict of this process."""
+
+    def __init__(self):
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def load(self, sid):
+        """Return (data, expires) for an unexpired session, otherwise None."""
+        with self.lock:
+            entry = self.sessions.get(sid)
+        if entry is None or entry[2] <= time.time():
+            return None
+        return entry[1], entry[2]
+
+    def save(self, sid, data, user_id, expires):
+        with self.lock:
+            self.sessions[sid] = (user_id, data, expires)
+
+    def delete(self, sid):
+        with self.lock:
+            self.sessions.pop(sid, None)
+
+    def delete_user(self, user_id):
+        """End every session of an account."""
+        with self.lock:
+            for sid in [sid for sid, entry in self.sessions.items() if entry[0] == user_id]:
+                del self.sessions[sid]
+
+    def sweep(self):
+        """Delete expired sessions."""
+        now = time.time()
+        with self.lock:
+            for sid in [sid for sid, entry in self.sessions.items() if entry[2] <= now]:
+                del self.sessions[sid]
+
+class FileSystemStore:
+    """Sessions as JSON files in a directory, one per session."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, sid):
+        return os.path.join(self.directory, sid)
+
+    def read(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, sid):
+        entry = self.read(self.path(sid))
+        if entry is None or entry['expires'] <= time.time():
+            return None
+        return entry['data'], entry['expires']
+
+    def save(self, sid, data, user_id, expires):
+        # Written to a temporary file and renamed, so readers never see half a session
+        fd, temporary = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'user_id': user_id, 'data': data, 'expires': expires}, f)
+        os.replace(temporary, self.path(sid))
+
+    def delete(self, sid):
+        try:
+            os.remove(self.path(sid))
+        except FileNotFoundError:
+            pass
+
+    def delete_user(self, user_id):
+        for sid in self.session_ids():
+            entry = self.read(self.path(sid))
+            if entry is not None and entry['user_id'] == user_id:
+                self.delete(sid)
+
+    def sweep(self):
+        now = time.time()
+        for sid in self.session_ids():
+            entry = self.read(self.path(sid))
+            if entry is not None and entry['expires'] <= now:
+                self.delete(sid)
+
+    def session_ids(self):
+        return [name for name in os.listdir(self.directory) if SESSION_ID.match(name)]
+
+class SQLiteStore:
+    """Sessions in a table of their own SQLite database file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        conn = self.connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS session (
+                sid TEXT PRIMARY KEY,
+                user_id INTEGER,
+                data TEXT NOT NULL,
+                expires REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_session_user_id ON session (user_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_session_expires ON session (expires)")
+        conn.commit()
+
+    def connection(self):
+        # One connection per thread, opened again in each forked worker
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path)
+            sqlite_tuning.configure_connection(conn)
+            self.local.conn, self.local.pid = conn, os.getpid()
+        return conn
+
+    def load(self, sid):
+        row = self.connection().execute(
+            "SELECT data, expires FROM session WHERE sid = ? AND expires > ?", (sid, time.time())
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def save(self, sid, data, user_id, expires):
+        with self.connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO session (sid, user_id, data, expires) VALUES (?, ?, ?, ?)",
+                         (sid, user_id, data, expires))
+
+    def delete(self, sid):
+        with self.connection() as conn:
+            conn.execute("DELETE FROM session WHERE sid = ?", (sid,))
+
+    def delete_user(self, user_id):
+        with self.connection() as conn:
+            conn.execute("DELETE FROM session WHERE user_id = ?", (user_id,))
+
+    def sweep(self):
+        with self.connection() as conn:
+            conn.execute("DELETE FROM session WHERE expires <= ?", (time.time(),))
+
+def make_store(backend, path):
+    """Return the store for a SESSION_BACKEND setting, or None for signed cookie sessions."""
+    if not backend or backend == 'cookie':
+        return None
+    if backend == 'memory':
+        return MemoryStore()
+    if backend == 'filesystem':
+        return FileSystemStore(path)
+    if backend == 'sqlite':
+        return SQLiteStore(path)
+    raise ValueError(f"Unknown SESSION_BACKEND {backend!r}: use cookie, sqlite, filesystem or memory")
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface keeping sessions in a store and only their id in the cookie."""
+
+    def __init__(self, store, lifetime, sweep_interval=600):
+        self.store = store
+        self.lifetime = lifetime
+        self.sweep_interval = sweep_interval
+        self.next_sweep = time.time() + sweep_interval
+        self.lock = threading.Lock()
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app), '')
+        entry = self.store.load(sid) if SESSION_ID.match(sid) else None
+        if entry is None:
+            return ServerSideSession()
+        data, expires = entry
+        return ServerSideSession(session_json_serializer.loads(data), sid, expires)
+
+    def save_session(self, app, session, response):
+        self.sweep_expired()
+        name, domain, path = self.get_cookie_name(app), self.get_cookie_domain(app), self.get_cookie_path(app)
+
+        if not session:
+            if session.sid is not None:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path,
+                                       secure=self.get_cookie_secure(app),
+                                       samesite=self.get_cookie_samesite(app),
+                                       httponly=self.get_cookie_httponly(app))
+            return
+
+        response.vary.add('Cookie')
+        now = time.time()
+        user_id = session.get('user_id')
+        sid = session.sid
+        if sid is None or user_id != session.stored_user_id:
+            # A new id whenever the account changes, so an id seen before login is worthless after it
+            if sid is not None:
+                self.store.delete(sid)
+            sid = secrets.token_urlsafe(32)
+        elif not session.modified and session.expires - now > self.lifetime - 60:
+            # Unchanged and used within the last minute: no need to extend the expiry yet
+            return
+
+        self.store.save(sid, session_json_serializer.dumps(dict(session)), user_id, now + self.lifetime)
+        if sid != session.sid:
+            response.set_cookie(name, sid, expires=self.get_expiration_time(app, session),
+                                httponly=self.get_cookie_httponly(app), domain=domain, path=path,
+                                secure=self.get_cookie_secure(app),
+                                samesite=self.get_cookie_samesite(app))
+
+    def sweep_expired(self):
+        with self.lock:
+            if time.time() < self.next_sweep:
+                return
+            self.next_sweep = time.time() + self.sweep_interval
+        self.store.sweep()
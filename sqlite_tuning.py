@@ -0,0 +1,30 @@
+"""
+SQLite connection settings shared by the web and desktop applications.
+Write-ahead logging lets readers keep reading while a write is in progress
+(with the default rollback journal every write blocks all readers), and the
+busy timeout makes a connection wait for a competing writer instead of failing
+at once with "database is locked".
+"""
+
+# Defaults; the web application can override them from its configuration
+BUSY_TIMEOUT_MS = 5000
+# Negative cache sizes are in KiB: about 20 MB of page cache per connection
+CACHE_SIZE_KB = 20000
+# Read the database through a memory map of up to 256 MB
+MMAP_SIZE = 256 * 1024 * 1024
+
+def configure_connection(conn, busy_timeout_ms=BUSY_TIMEOUT_MS, cache_size_kb=CACHE_SIZE_KB,
+                         mmap_size=MMAP_SIZE):
+    """
+    Apply the settings to a new sqlite3 connection (before it is used).
+    WAL mode is stored in the database file; the other settings last for the connection.
+    synchronous=NORMAL is safe with WAL: a power loss can only lose the last
+    transactions, never corrupt the database.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+    cursor.execute("PRAGMA journal_mode = WAL")
+    cursor.execute("PRAGMA synchronous = NORMAL")
+    cursor.execute(f"PRAGMA cache_size = {-int(cache_size_kb)}")
+    cursor.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+    cursor.close()
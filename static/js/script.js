@@ -8,6 +8,7 @@ document.addEventListener('DOMContentLoaded', function() {
     const nameField = document.getElementById('name');
     const classField = document.getElementById('class');
     const dateField = document.getElementById('date');
+    const statusField = document.getElementById('status');
     const submitBtn = document.getElementById('submitBtn');
     const updateBtn = document.getElementById('updateBtn');
     const clearBtn = document.getElementById('clearBtn');
@@ -38,7 +39,7 @@ document.addEventListener('DOMContentLoaded', function() {
             const recordId = e.target.getAttribute('data-id');
             
             // Get record data
-            fetch(`/api/record/${recordId}`)
+            fetch(`/api/v1/records/${recordId}`)
                 .then(response => response.json())
                 .then(data => {
                     // Fill the form with record data
@@ -47,6 +48,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     nameField.value = data.name;
                     classField.value = data.class_name;
                     dateField.value = data.date;
+                    statusField.value = data.status;
                     
                     // Change form appearance for update mode
                     submitBtn.style.display = 'none';
@@ -72,30 +74,144 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
     
+    // Live search: results come from the JSON API as the user types. Requests
+    // wait until typing pauses, and a new request cancels the one in flight,
+    // so a fast typist never has overlapping queries or out-of-order results.
+    const SEARCH_DELAY_MS = 250;
+    // Shorter words are not searched for (search_index.MIN_WORD_LENGTH on the server)
+    const SEARCH_MIN_LENGTH = 2;
+    let searchTimer = null;
+    let searchController = null;
+    let currentSearch = searchInput.value.trim();
+    let loadingMore = false;
+    
+    // Fetch one page of records (newest first, or ranked matches for a search term)
+    function requestRecords(searchTerm, cursor) {
+        if (searchController) {
+            searchController.abort();
+        }
+        const controller = new AbortController();
+        searchController = controller;
+        
+        const params = new URLSearchParams({ q: searchTerm });
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
+        return fetch(`/api/v1/records/search?${params}`, { signal: controller.signal })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`Search failed with status ${response.status}`);
+                }
+                return response.json();
+            })
+            .finally(() => {
+                if (searchController === controller) {
+                    searchController = null;
+                }
+            });
+    }
+    
+    function reportError(error) {
+        // Cancelled requests were replaced by a newer one
+        if (error.name !== 'AbortError') {
+            console.error('Error fetching records:', error);
+        }
+    }
+    
+    // Build a table row for a record (text is set as text, never as HTML)
+    function recordRow(record) {
+        const row = document.createElement('tr');
+        [record.id, record.student_id, record.name, record.class_name, record.date].forEach(value => {
+            const cell = document.createElement('td');
+            cell.textContent = value;
+            row.appendChild(cell);
+        });
+        
+        const statusCell = document.createElement('td');
+        const badge = document.createElement('span');
+        badge.className = `badge bg-${record.status === 'absent' ? 'danger' : 'success'}`;
+        badge.textContent = record.status;
+        statusCell.appendChild(badge);
+        row.appendChild(statusCell);
+        
+        const actionsCell = document.createElement('td');
+        const editBtn = document.createElement('button');
+        editBtn.className = 'btn btn-sm btn-warning edit-btn';
+        editBtn.dataset.id = record.id;
+        editBtn.textContent = 'Edit';
+        const deleteLink = document.createElement('a');
+        deleteLink.className = 'btn btn-sm btn-danger';
+        deleteLink.href = `/delete/${record.id}`;
+        deleteLink.textContent = 'Delete';
+        deleteLink.addEventListener('click', function(e) {
+            if (!confirm('Are you sure you want to delete this record?')) {
+                e.preventDefault();
+            }
+        });
+        actionsCell.append(editBtn, ' ', deleteLink);
+        row.appendChild(actionsCell);
+        return row;
+    }
+    
+    function setNextCursor(nextCursor, searchTerm) {
+        const loadMoreBtn = document.getElementById('loadMoreBtn');
+        loadMoreBtn.dataset.nextCursor = nextCursor || '';
+        loadMoreBtn.dataset.search = searchTerm;
+        document.getElementById('loadMoreContainer').style.display = nextCursor ? '' : 'none';
+    }
+    
+    // True for an empty term (all records) or one with a word long enough to search for
+    function searchable(searchTerm) {
+        return !searchTerm || searchTerm.split(/\s+/).some(word => word.length >= SEARCH_MIN_LENGTH);
+    }
+    
+    // Replace the records table with the first page of results for searchTerm
+    function showRecords(searchTerm) {
+        clearTimeout(searchTimer);
+        currentSearch = searchTerm;
+        loadingMore = false;
+        
+        requestRecords(searchTerm, '')
+            .then(data => {
+                const rows = data.records.map(recordRow);
+                if (!rows.length) {
+                    const row = document.createElement('tr');
+                    const cell = document.createElement('td');
+                    cell.colSpan = 7;
+                    cell.className = 'text-center';
+                    cell.textContent = 'No records found';
+                    row.appendChild(cell);
+                    rows.push(row);
+                }
+                document.getElementById('recordsBody').replaceChildren(...rows);
+                setNextCursor(data.next_cursor, searchTerm);
+            })
+            .catch(reportError);
+    }
+    
+    // Search as the user types, once typing pauses
+    searchInput.addEventListener('input', function() {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(function() {
+            const searchTerm = searchInput.value.trim();
+            if (searchTerm !== currentSearch && searchable(searchTerm)) {
+                showRecords(searchTerm);
+            }
+        }, SEARCH_DELAY_MS);
+    });
+    
     // Search functionality
     searchBtn.addEventListener('click', function() {
         const searchTerm = searchInput.value.trim();
-        
-        // Fetch search results
-        fetch(`/search?search=${encodeURIComponent(searchTerm)}`)
-            .then(response => response.text())
-            .then(html => {
-                recordsContainer.innerHTML = html;
-            })
-            .catch(error => console.error('Error searching records:', error));
+        if (searchable(searchTerm)) {
+            showRecords(searchTerm);
+        }
     });
     
     // Show all records
     showAllBtn.addEventListener('click', function() {
         searchInput.value = '';
-        
-        // Fetch all records
-        fetch('/search')
-            .then(response => response.text())
-            .then(html => {
-                recordsContainer.innerHTML = html;
-            })
-            .catch(error => console.error('Error fetching records:', error));
+        showRecords('');
     });
     
     // Search on Enter key press
@@ -104,4 +220,52 @@ document.addEventListener('DOMContentLoaded', function() {
             searchBtn.click();
         }
     });
+    
+    // Load the next page of records and append it to the table
+    function loadMore() {
+        const loadMoreBtn = document.getElementById('loadMoreBtn');
+        const cursor = loadMoreBtn ? loadMoreBtn.dataset.nextCursor : '';
+        // A search in flight replaces the table, so its old next page is not wanted
+        if (!cursor || loadingMore || searchController) {
+            return;
+        }
+        
+        loadingMore = true;
+        const searchTerm = loadMoreBtn.dataset.search || '';
+        requestRecords(searchTerm, cursor)
+            .then(data => {
+                document.getElementById('recordsBody').append(...data.records.map(recordRow));
+                setNextCursor(data.next_cursor, searchTerm);
+            })
+            .catch(reportError)
+            .finally(() => {
+                loadingMore = false;
+            });
+    }
+    
+    // Load more button click handler (using event delegation)
+    document.addEventListener('click', function(e) {
+        if (e.target && e.target.id === 'loadMoreBtn') {
+            loadMore();
+        }
+    });
+    
+    // Infinite scroll: fetch the next page when the load more button comes into view
+    const scrollObserver = 'IntersectionObserver' in window
+        ? new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                loadMore();
+            }
+        }, { rootMargin: '200px' })
+        : null;
+    
+    function observeLoadMore() {
+        const loadMoreBtn = document.getElementById('loadMoreBtn');
+        if (scrollObserver && loadMoreBtn) {
+            scrollObserver.disconnect();
+            scrollObserver.observe(loadMoreBtn);
+        }
+    }
+    
+    observeLoadMore();
 });
\ No newline at end of file
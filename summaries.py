@@ -0,0 +1,118 @@
+"""
+Pre-aggregated attendance counts for the summary reports.
+Two tables are kept up to date as records are added, changed and deleted:
+present/absent counts per student per month and per class per day. Reports
+read these instead of counting attendance rows, so their cost depends on the
+number of students, classes and days shown, not on the size of the history.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from sqlalchemy import Date, bindparam, text
+
+# Add count changes to a summary row, creating it if needed (SQLite 3.24+ and PostgreSQL)
+STUDENT_MONTH_UPSERT_SQL = text("""
+    INSERT INTO student_month_summary (class_id, month, student_pk, present, absent)
+    VALUES (:class_id, :month, :student_pk, :present, :absent)
+    ON CONFLICT (class_id, month, student_pk) DO UPDATE SET
+        present = student_month_summary.present + excluded.present,
+        absent = student_month_summary.absent + excluded.absent
+""").bindparams(bindparam('month', type_=Date))
+
+CLASS_DAY_UPSERT_SQL = text("""
+    INSERT INTO class_day_summary (class_id, date, present, absent)
+    VALUES (:class_id, :date, :present, :absent)
+    ON CONFLICT (class_id, date) DO UPDATE SET
+        present = class_day_summary.present + excluded.present,
+        absent = class_day_summary.absent + excluded.absent
+""").bindparams(bindparam('date', type_=Date))
+
+# Recount both tables from the attendance table; {month} is the dialect's
+# expression for the first day of the record's month
+REBUILD_STATEMENTS = [
+    "DELETE FROM student_month_summary",
+    "DELETE FROM class_day_summary",
+    """
+    INSERT INTO student_month_summary (class_id, month, student_pk, present, absent)
+    SELECT class_id, {month}, student_pk,
+           SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN status = 'absent' THEN 1 ELSE 0 END)
+    FROM attendance
+    GROUP BY class_id, {month}, student_pk
+    """,
+    """
+    INSERT INTO class_day_summary (class_id, date, present, absent)
+    SELECT class_id, date,
+           SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN status = 'absent' THEN 1 ELSE 0 END)
+    FROM attendance
+    GROUP BY class_id, date
+    """,
+]
+
+MONTH_EXPRESSIONS = {
+    'sqlite': "strftime('%Y-%m-01', date)",
+    'postgresql': "CAST(date_trunc('month', date) AS DATE)",
+}
+
+def month_start(date):
+    """Return the first day of the date's month, the key of the monthly summary."""
+    return date.replace(day=1)
+
+def next_month(month):
+    """Return the first day of the month after the given month."""
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def summary_changes(removed=(), added=()):
+    """
+    Turn removed and added records into count changes for both summary tables.
+    Records are (student_pk, class_id, date, status) tuples; changes that
+    cancel out (such as an update that changes nothing counted) are dropped.
+    """
+    students, classes = Counter(), Counter()
+    for sign, records in ((-1, removed), (1, added)):
+        for student_pk, class_id, date, status in records:
+            students[class_id, month_start(date), student_pk, status] += sign
+            classes[class_id, date, status] += sign
+
+    student_rows = {}
+    for (class_id, month, student_pk, status), count in students.items():
+        if count:
+            row = student_rows.setdefault((class_id, month, student_pk), {
+                'class_id': class_id, 'month': month, 'student_pk': student_pk,
+                'present': 0, 'absent': 0,
+            })
+            row[status] += count
+
+    class_rows = {}
+    for (class_id, date, status), count in classes.items():
+        if count:
+            row = class_rows.setdefault((class_id, date), {
+                'class_id': class_id, 'date': date, 'present': 0, 'absent': 0,
+            })
+            row[status] += count
+
+    return list(student_rows.values()), list(class_rows.values())
+
+def apply_changes(session, removed=(), added=()):
+    """
+    Update the summary tables for removed and added records, in the caller's
+    transaction. An update is the old record removed and the new one added.
+    """
+    student_rows, class_rows = summary_changes(removed, added)
+    if student_rows:
+        session.execute(STUDENT_MONTH_UPSERT_SQL, student_rows)
+    if class_rows:
+        session.execute(CLASS_DAY_UPSERT_SQL, class_rows)
+
+def rebuild(conn):
+    """Recount the summary tables from scratch (used when they are created)."""
+    month = MONTH_EXPRESSIONS[conn.dialect.name]
+    for statement in REBUILD_STATEMENTS:
+        conn.exec_driver_sql(statement.format(month=month))
+
+def percentage(present, absent):
+    """Attendance percentage for the counts, or None when nothing was recorded."""
+    total = present + absent
+    return round(100 * present / total, 1) if total else None
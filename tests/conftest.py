@@ -0,0 +1,15 @@
+"""
+Shared test setup.
+The web application reads DATABASE_URL when it is imported, so it is pointed
+at a throwaway SQLite database here, before any test module imports it.
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATABASE_DIR = tempfile.mkdtemp(prefix='attendance-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(DATABASE_DIR, 'web.db')}"
@@ -0,0 +1,58 @@
+"""
+Malformed paging cursors and record ids: they must be rejected (or ignored
+where the page is HTML), never reach the database and fail there with a 500.
+"""
+
+import pytest
+
+import repository
+import search_index
+
+@pytest.fixture(scope='module')
+def client():
+    from app import app
+
+    client = app.test_client()
+    client.get('/init-admin')
+    client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+    return client
+
+# '²' passes str.isdigit() but not int(); the others are out of the 64-bit id range
+BAD_IDS = ['²', '١٢', '0', '-1', '1.5', 'x', '9223372036854775808', '9' * 30]
+
+@pytest.mark.parametrize('value', BAD_IDS)
+def test_parse_id_rejects(value):
+    assert repository.parse_id(value) is None
+
+def test_parse_id_accepts():
+    assert repository.parse_id('42') == 42
+    assert repository.parse_id(str(2 ** 63 - 1)) == 2 ** 63 - 1
+
+@pytest.mark.parametrize('cursor', ['', '5', '-1.5', 'nan:5', 'inf:5', '-1.5:0', '-1.5:' + '9' * 30, '-1.5:²'])
+def test_decode_cursor_rejects(cursor):
+    assert search_index.decode_cursor(cursor) is None
+
+def test_decode_cursor_round_trip():
+    assert search_index.decode_cursor(search_index.encode_cursor(-1.25, 7)) == (-1.25, 7)
+
+@pytest.mark.parametrize('cursor', BAD_IDS)
+def test_api_list_rejects_cursor(client, cursor):
+    response = client.get('/api/v1/records', query_string={'cursor': cursor})
+    assert response.status_code == 400
+    assert response.json['error'] == 'Invalid cursor'
+
+@pytest.mark.parametrize('search', ['', 'ab'])
+@pytest.mark.parametrize('cursor', BAD_IDS + ['-1.5:' + '9' * 30, 'nan:5'])
+def test_api_search_rejects_cursor(client, search, cursor):
+    response = client.get('/api/v1/records/search', query_string={'q': search, 'cursor': cursor})
+    assert response.status_code == 400
+    assert response.json['error'] == 'Invalid cursor'
+
+@pytest.mark.parametrize('ids', [[5.7], [True], ['1'], [0], [2 ** 63], [None]])
+def test_api_batch_rejects_ids(client, ids):
+    response = client.delete('/api/v1/records/batch', json={'ids': ids})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('ids', ['²', '1.5', '9223372036854775808'])
+def test_api_batch_get_rejects_ids(client, ids):
+    assert client.get('/api/v1/records/batch', query_string={'ids': ids}).status_code == 400
@@ -0,0 +1,37 @@
+"""
+The check-query-plans command against a seeded database: every route query
+must use an index, not read the whole attendance table.
+"""
+
+import pytest
+
+from benchmarks.dataset import Dataset, write_web
+
+@pytest.fixture(scope='module')
+def result():
+    from app import app, db
+
+    with app.app_context():
+        write_web(db.engine, Dataset(5000))
+    return app.test_cli_runner().invoke(args=['check-query-plans'])
+
+def plans(output):
+    """Return {label: [plan steps]} from the command's output lines ("ok   label: step; step")."""
+    found = {}
+    for line in output.splitlines():
+        status, _, rest = line.partition(' ')
+        if status in ('ok', 'FAIL'):
+            label, _, steps = rest.strip().partition(': ')
+            found[label] = steps.split('; ')
+    return found
+
+def test_check_query_plans_passes(result):
+    assert result.exit_code == 0, result.output
+    assert 'FAIL' not in result.output
+
+def test_no_query_scans_attendance(result):
+    scans = {label for label, steps in plans(result.output).items()
+             if any(step.split()[:2] == ['SCAN', 'attendance'] for step in steps)}
+    # The first dashboard page walks the primary key newest first and stops at its LIMIT
+    assert scans == {'dashboard'}
+    assert plans(result.output)['dashboard'][0] == 'SCAN attendance'
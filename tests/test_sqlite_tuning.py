@@ -0,0 +1,91 @@
+"""
+Connections configured by sqlite_tuning, used from several threads at once as
+the web workers and the desktop application's database thread use them.
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+import sqlite_tuning
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / 'tuning.db')
+    conn = connect(path)
+    conn.execute("CREATE TABLE attendance (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+    conn.executemany("INSERT INTO attendance (name) VALUES (?)", [(f"Student {i}",) for i in range(100)])
+    conn.commit()
+    conn.close()
+    return path
+
+def connect(path, **settings):
+    # Autocommit off, as the applications use it; check_same_thread off to hand over to a thread
+    conn = sqlite3.connect(path, check_same_thread=False)
+    sqlite_tuning.configure_connection(conn, **settings)
+    return conn
+
+def test_settings_are_applied(path):
+    conn = connect(path, busy_timeout_ms=1234)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+def test_reader_is_not_blocked_by_writer(path):
+    writing, reader_done = threading.Event(), threading.Event()
+    errors = []
+
+    def write():
+        try:
+            # A small page cache makes the write spill to the database file before
+            # it commits, which locks out readers unless the journal is a write-ahead log
+            conn = connect(path, cache_size_kb=64)
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("INSERT INTO attendance (name) VALUES (?)", [("x" * 500,)] * 5000)
+            writing.set()
+            # Hold the write transaction open until the reader has finished
+            reader_done.wait(5)
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            errors.append(e)
+            writing.set()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    assert writing.wait(5)
+
+    # With a busy timeout of 0 a blocked read would fail at once with "database is locked"
+    reader = connect(path, busy_timeout_ms=0)
+    try:
+        assert reader.execute("SELECT COUNT(*) FROM attendance").fetchone()[0] == 100
+    finally:
+        reader_done.set()
+        writer.join(5)
+    assert not errors
+    assert reader.execute("SELECT COUNT(*) FROM attendance").fetchone()[0] == 5100
+    reader.close()
+
+def test_concurrent_writers_wait_for_each_other(path):
+    errors = []
+
+    def write(thread):
+        try:
+            conn = connect(path)
+            for i in range(20):
+                with conn:
+                    conn.execute("INSERT INTO attendance (name) VALUES (?)", (f"Thread {thread} {i}",))
+            conn.close()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert not errors
+    conn = connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0] == 180
+    conn.close()
@@ -0,0 +1,54 @@
+"""
+Short-lived in-process cache for the logged-in user's details.
+Authorization checks run on every request; caching each user's role for a few
+seconds saves a database query per request. Entries are dropped as soon as the
+user is changed in this process, and expire after the TTL so changes made by
+other worker processes are picked up shortly after.
+"""
+
+import threading
+import time
+
+class TTLCache:
+    """Thread-safe mapping whose entries expire ttl seconds after they are stored."""
+
+    def __init__(self, ttl, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value, or default if it is missing or expired."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self.entries[key]
+                return default
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            if len(self.entries) >= self.max_size:
+                self._prune()
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def _prune(self):
+        """Drop expired entries, or everything if none have expired (lock held)."""
+        now = time.monotonic()
+        expired = [key for key, (expires, _) in self.entries.items() if expires <= now]
+        for key in expired:
+            del self.entries[key]
+        if not expired:
+            self.entries.clear()
